@@ -0,0 +1,142 @@
+"""
+Ленты и страницы новости: синхронные представления под WSGI, они же
+под ASGI и асинхронные представления под ASGI при высокой конкуренции.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.asgi_views --concurrency 1 8 32 64
+"""
+import argparse
+import asyncio
+import time
+from importlib import reload
+
+from benchmarks.common import (
+    report, run_load, setup_django, summary_ms,
+)
+
+
+def use_views(mode):
+    """Пересобирает URL-схему под NEWS_VIEWS_MODE."""
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    import news.urls
+    import yanews.urls
+
+    settings.NEWS_VIEWS_MODE = mode
+    reload(news.urls)
+    reload(yanews.urls)
+    clear_url_caches()
+
+
+def seed(news, comments, users):
+    """Новости с комментариями и читатели."""
+    from django.contrib.auth import get_user_model
+
+    from news.models import Comment, News
+
+    user_model = get_user_model()
+    user_model.objects.bulk_create(
+        user_model(username=f'reader{i}') for i in range(users)
+    )
+    News.objects.bulk_create(
+        News(title=f'Новость {i}', text='Текст новости') for i in range(news)
+    )
+    authors = list(user_model.objects.all())
+    news_ids = list(News.objects.values_list('id', flat=True))
+    Comment.objects.bulk_create(
+        Comment(
+            news_id=news_ids[i % len(news_ids)],
+            author=authors[i % len(authors)],
+            text=f'Комментарий {i}',
+        )
+        for i in range(comments)
+    )
+    return authors, news_ids
+
+
+async def run_async_load(users, paths, concurrency, iterations):
+    """Как run_load, но запросы идут через AsyncClient в одном цикле."""
+    from django.test import AsyncClient
+
+    clients = []
+    for index in range(concurrency):
+        client = AsyncClient()
+        await asyncio.to_thread(client.force_login, users[index % len(users)])
+        clients.append(client)
+    results = []
+
+    async def worker(client, index):
+        for number in range(iterations):
+            path = paths[(index * iterations + number) % len(paths)]
+            started = time.perf_counter()
+            response = await client.get(path)
+            results.append((
+                (time.perf_counter() - started) * 1000, response.status_code
+            ))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        worker(client, index) for index, client in enumerate(clients)
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(results),
+        'rps': round(len(results) / elapsed, 1),
+        'latency_ms': summary_ms([result[0] for result in results]),
+        'errors': sum(result[1] >= 400 for result in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=1_000)
+    parser.add_argument('--comments', type=int, default=20_000)
+    parser.add_argument('--users', type=int, default=64)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 8, 32, 64]
+    )
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.urls import reverse
+
+    users, news_ids = seed(args.news, args.comments, args.users)
+    routes = {
+        'news:home': [reverse('news:home')],
+        'news:detail': [
+            reverse('news:detail', args=(pk,)) for pk in news_ids[:100]
+        ],
+    }
+    results = {}
+    for name, paths in routes.items():
+        def scenario(session, number):
+            session.get(name, paths[number % len(paths)])
+
+        use_views('sync')
+        results[name] = {'wsgi': {}, 'asgi-sync': {}, 'asgi-async': {}}
+        for concurrency in args.concurrency:
+            results[name]['wsgi'][concurrency] = run_load(
+                scenario, users, concurrency, args.iterations
+            )[name]
+        for mode, views in (('asgi-sync', 'sync'), ('asgi-async', 'async')):
+            use_views(views)
+            for concurrency in args.concurrency:
+                results[name][mode][concurrency] = asyncio.run(
+                    run_async_load(
+                        users, paths, concurrency, args.iterations
+                    )
+                )
+    report({
+        'news': args.news,
+        'comments': args.comments,
+        'iterations': args.iterations,
+        'db_threads': settings.NEWS_ASYNC_DB_THREADS,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
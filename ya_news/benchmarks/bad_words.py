@@ -0,0 +1,67 @@
+"""
+Сравнение прежней проверки запрещённых слов с компилированным поиском.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.bad_words
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import measure, report, summary
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+
+def random_word(rng, min_length=5, max_length=12):
+    length = rng.randint(min_length, max_length)
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def loop_matcher(words):
+    """Прежняя реализация: проверка вхождения каждого слова по очереди."""
+    def search(text):
+        lowered_text = text.lower()
+        for word in words:
+            if word in lowered_text:
+                return word
+        return None
+    return search
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10, 1_000, 100_000]
+    )
+    parser.add_argument('--comment-length', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    from news.moderation import BadWordsMatcher
+
+    rng = random.Random(0)
+    comment_words = []
+    while sum(map(len, comment_words)) < args.comment_length:
+        comment_words.append(random_word(rng, 2, 8))
+    comment = ' '.join(comment_words)
+    results = []
+    for size in args.sizes:
+        words = [random_word(rng) for _ in range(size)]
+        start = time.perf_counter()
+        matcher = BadWordsMatcher(words)
+        build_ms = (time.perf_counter() - start) * 1000
+        old = loop_matcher(words)
+        results.append({
+            'words': size,
+            'build_ms': round(build_ms, 3),
+            'loop_ms': summary(measure(lambda: old(comment), args.repeat)),
+            'compiled_ms': summary(
+                measure(lambda: matcher.search(comment), args.repeat)
+            ),
+        })
+    report({'comment_length': len(comment), 'results': results})
+
+
+if __name__ == '__main__':
+    main()
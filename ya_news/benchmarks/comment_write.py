@@ -0,0 +1,77 @@
+"""
+Пропускная способность записи комментариев в SQLite: журнал
+по умолчанию против WAL с synchronous=NORMAL и busy_timeout.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.comment_write --concurrency 1 4 8
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import report, run_load, setup_django
+
+
+def prepare(mode, pragmas, users):
+    """Переключает соединения на новую базу с нужными настройками."""
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+
+    from news.models import News
+
+    settings.SQLITE_PRAGMAS = pragmas
+    connection.close()
+    connection.settings_dict['NAME'] = str(
+        Path(tempfile.mkdtemp()) / f'{mode}.sqlite3'
+    )
+    call_command('migrate', verbosity=0)
+    user_model = get_user_model()
+    user_model.objects.bulk_create(
+        user_model(username=f'writer{i}') for i in range(users)
+    )
+    news = News.objects.create(title='Новость', text='Текст новости')
+    return list(user_model.objects.all()), news
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 2, 4, 8]
+    )
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.urls import reverse
+
+    from news.models import Comment
+
+    # default — так SQLite работал до SQLITE_PRAGMAS.
+    modes = {'default': {}, 'wal': settings.SQLITE_PRAGMAS}
+    results = {}
+    for mode, pragmas in modes.items():
+        users, news = prepare(mode, pragmas, max(args.concurrency))
+        url = reverse('news:detail', args=(news.pk,))
+
+        def comment(session, number):
+            session.post('news:detail POST', url, {'text': f'Текст {number}'})
+
+        results[mode] = {
+            concurrency: run_load(
+                comment, users, concurrency, args.iterations
+            )['news:detail POST']
+            for concurrency in args.concurrency
+        }
+        results[mode]['comments'] = Comment.objects.count()
+    report({
+        'iterations': args.iterations,
+        'pragmas': settings.SQLITE_PRAGMAS,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+"""
+Помощники для замеров производительности YaNews.
+
+Сами помощники общие для проектов и лежат в yacommon.benchmarks.
+"""
+import sys
+from functools import partial
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+# Общие для YaNews и YaNote модули лежат в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
+
+from yacommon import benchmarks  # noqa: E402
+from yacommon.benchmarks import (  # noqa: E402, F401
+    measure,
+    report,
+    run_load,
+    summary,
+    summary_ms,
+)
+
+setup_django = partial(benchmarks.setup_django, 'yanews.settings', BASE_DIR)
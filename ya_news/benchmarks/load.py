@@ -0,0 +1,128 @@
+"""
+Нагрузочный прогон маршрутов YaNews через WSGI в одном процессе.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.load --news 10000 --comments 100000 \
+        --concurrency 1 2 4 8
+"""
+import argparse
+import random
+from datetime import date, timedelta
+from io import StringIO
+
+from benchmarks.common import report, run_load, setup_django
+
+# Сколько первых новостей читают и комментируют сценарии.
+HOT_NEWS = 100
+
+
+def seed(news, comments, users, batch_size, rng):
+    """Пакетно создаёт пользователей, новости, комментарии и индекс."""
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from news.models import Comment, News
+
+    user_model = get_user_model()
+    user_model.objects.bulk_create(
+        user_model(username=f'reader{i}') for i in range(users)
+    )
+    today = date.today()
+    for start in range(0, news, batch_size):
+        News.objects.bulk_create(
+            News(
+                title=f'Новость {i}',
+                text='Текст новости',
+                date=today - timedelta(days=i // 10),
+            )
+            for i in range(start, min(start + batch_size, news))
+        )
+    author_ids = list(user_model.objects.values_list('id', flat=True))
+    news_ids = list(News.objects.values_list('id', flat=True))
+    for start in range(0, comments, batch_size):
+        Comment.objects.bulk_create(
+            Comment(
+                news_id=rng.choice(news_ids),
+                author_id=rng.choice(author_ids),
+                text=f'Комментарий {i}',
+            )
+            for i in range(start, min(start + batch_size, comments))
+        )
+    call_command('recount_comments', stdout=StringIO())
+    call_command('rebuild_news_index', stdout=StringIO())
+    return list(user_model.objects.all()), news_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=10_000)
+    parser.add_argument('--comments', type=int, default=100_000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 2, 4, 8]
+    )
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    args = parser.parse_args()
+    if args.news < 1 or args.users < 1:
+        parser.error('--news и --users должны быть не меньше 1.')
+
+    setup_django()
+    from django.urls import reverse
+
+    from news.models import Comment
+
+    users, news_ids = seed(
+        args.news, args.comments, args.users, args.batch_size,
+        random.Random(0),
+    )
+
+    hot_news = news_ids[:HOT_NEWS]
+
+    def detail_url(number):
+        return reverse(
+            'news:detail', args=(hot_news[number % len(hot_news)],)
+        )
+
+    def home(session, number):
+        session.get('news:home', reverse('news:home'))
+
+    def detail(session, number):
+        session.get('news:detail', detail_url(number))
+
+    def comment(session, number):
+        text = f'Нагрузка {number}'
+        session.post('news:detail POST', detail_url(number), {'text': text})
+        pk = Comment.objects.values_list('pk', flat=True).get(text=text)
+        session.post(
+            'news:edit POST',
+            reverse('news:edit', args=(pk,)),
+            {'text': f'{text}, исправлено'},
+        )
+        session.post('news:delete POST', reverse('news:delete', args=(pk,)))
+
+    scenarios = {
+        'home (anonymous)': (home, None),
+        'home': (home, users),
+        'detail': (detail, users),
+        'comment': (comment, users),
+    }
+    results = {}
+    for name, (scenario, scenario_users) in scenarios.items():
+        results[name] = {
+            concurrency: run_load(
+                scenario, scenario_users, concurrency, args.iterations
+            )
+            for concurrency in args.concurrency
+        }
+    report({
+        'news': args.news,
+        'comments': args.comments,
+        'users': args.users,
+        'iterations': args.iterations,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
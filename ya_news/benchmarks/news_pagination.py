@@ -0,0 +1,86 @@
+"""
+Сравнение курсорной и OFFSET-пагинации ленты новостей.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.news_pagination --rows 1000000
+"""
+import argparse
+from datetime import date, timedelta
+
+from benchmarks.common import measure, report, setup_django, summary
+
+NEWS_PER_DAY = 100
+
+
+def seed(rows, batch_size):
+    """Заполняет таблицу новостей недостающими записями."""
+    from news.models import News
+
+    existing = News.objects.count()
+    today = date.today()
+    for start in range(existing, rows, batch_size):
+        News.objects.bulk_create(
+            News(
+                title=f'Новость {i}',
+                text='Текст новости',
+                date=today - timedelta(days=i // NEWS_PER_DAY),
+            )
+            for i in range(start, min(start + batch_size, rows))
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--db', help='файл SQLite для повторных запусков')
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from news.models import News
+    from news.pagination import encode_cursor, keyset_page
+
+    seed(args.rows, args.batch_size)
+    size = settings.NEWS_COUNT_ON_HOME_PAGE
+    ordered = News.objects.order_by('-date', '-pk')
+    results = []
+    depths = [0] + [
+        depth for depth in (1_000, 10_000, 100_000, args.rows - size - 1)
+        if 0 < depth < args.rows - size
+    ]
+    for depth in depths:
+        cursor = None
+        if depth:
+            value, pk = ordered.values_list('date', 'pk')[depth - 1]
+            cursor = encode_cursor(value, pk)
+        keyset = measure(
+            lambda: keyset_page(
+                News.objects.all(), 'date', cursor, size, descending=True
+            ),
+            args.repeat,
+        )
+        offset = measure(
+            lambda: list(ordered[depth:depth + size]), args.repeat
+        )
+        results.append({
+            'depth': depth,
+            'keyset_ms': summary(keyset),
+            'offset_ms': summary(offset),
+        })
+
+    with CaptureQueriesContext(connection) as queries:
+        keyset_page(News.objects.all(), 'date', cursor, size, True)
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(f'EXPLAIN QUERY PLAN {queries[-1]["sql"]}')
+        plan = [row[-1] for row in db_cursor.fetchall()]
+    report({'rows': args.rows, 'page_size': size, 'plan': plan,
+            'results': results})
+
+
+if __name__ == '__main__':
+    main()
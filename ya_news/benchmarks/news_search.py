@@ -0,0 +1,92 @@
+"""
+Задержка поиска по новостям при росте таблицы.
+
+Каждое редкое слово встречается примерно в --docs-per-term новостях
+при любом размере таблицы, частое слово — в каждой сотой новости.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.news_search --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+from datetime import date
+
+from benchmarks.common import measure, report, setup_django, summary
+
+WORDS_PER_NEWS = 8
+
+
+def seed(start, stop, docs_per_term, rng, batch_size):
+    """Добавляет новости с номерами [start, stop) и индексирует их."""
+    from django.db.models import Max
+
+    from news.models import News
+    from news.search import index_news_list
+
+    vocabulary = max(stop // docs_per_term, 1)
+    last_pk = News.objects.aggregate(last=Max('pk'))['last'] or 0
+    for offset in range(start, stop, batch_size):
+        News.objects.bulk_create(
+            News(
+                title=f'Новость {i}',
+                text=' '.join(
+                    [f'слово{rng.randrange(vocabulary)}'
+                     for _ in range(WORDS_PER_NEWS)]
+                    + (['частое'] if i % 100 == 0 else [])
+                ),
+                date=date.today(),
+            )
+            for i in range(offset, min(offset + batch_size, stop))
+        )
+    index_news_list(
+        News.objects.filter(pk__gt=last_pk).only('id', 'title', 'text')
+        .iterator(chunk_size=batch_size),
+        batch_size,
+    )
+    return vocabulary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument('--docs-per-term', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    from news.pagination import keyset_page
+    from news.search import search_news
+
+    rng = random.Random(0)
+    size = settings.NEWS_SEARCH_COUNT_ON_PAGE
+    results = []
+    rows = 0
+    for target in sorted(args.sizes):
+        vocabulary = seed(rows, target, args.docs_per_term, rng,
+                          args.batch_size)
+        rows = target
+
+        def rare():
+            query = f'слово{rng.randrange(vocabulary)}'
+            keyset_page(search_news(query), 'rank', None, size, True)
+
+        def frequent():
+            keyset_page(search_news('частое'), 'rank', None, size, True)
+
+        results.append({
+            'rows': rows,
+            'rare_term_ms': summary(measure(rare, args.repeat)),
+            'frequent_term_ms': summary(
+                measure(frequent, min(args.repeat, 10))
+            ),
+        })
+    report({'docs_per_term': args.docs_per_term, 'results': results})
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,30 @@
+import json
+from pathlib import Path
+
 import pytest
 from datetime import datetime, timedelta
 from collections import namedtuple
+from contextlib import ExitStack, contextmanager
 
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from django.conf import settings
 from pytest_lazyfixture import lazy_fixture
 
+from news.events import get_broker
 from news.models import News, Comment
+from news.search import index_comments
+from yacommon.testing import (  # noqa: F401
+    django_db_setup,
+    fast_password_hasher,
+)
 
 PK = 1
+BASE_DIR = Path(__file__).parent
+QUERY_BUDGETS = BASE_DIR / 'news/pytest_tests/query_budgets.json'
 COMMENT_TEXT = 'Текст комментария'
 NEW_COMMENT_TEXT = 'Новый текст комментария'
 ADMIN = lazy_fixture('admin_client')
@@ -20,6 +35,7 @@ URL_NAME = namedtuple(
     'NAME',
     [
         'home',
+        'search',
         'detail',
         'edit',
         'delete',
@@ -31,6 +47,7 @@ URL_NAME = namedtuple(
 
 URL = URL_NAME(
     reverse('news:home'),
+    reverse('news:search'),
     reverse('news:detail', args=(PK,)),
     reverse('news:edit', args=(PK,)),
     reverse('news:delete', args=(PK,)),
@@ -40,6 +57,66 @@ URL = URL_NAME(
 )
 
 
+def pytest_collection_modifyitems(items):
+    """Тестам с базой доступны все базы из DATABASES, а не только default."""
+    for item in items:
+        marker = item.get_closest_marker('django_db')
+        if marker is not None and 'databases' not in marker.kwargs:
+            item.add_marker(pytest.mark.django_db(
+                *marker.args, **marker.kwargs, databases='__all__'
+            ), append=False)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш и брокер событий не переживают откат базы, очищаем их."""
+    cache.clear()
+    get_broker.cache_clear()
+
+
+@contextmanager
+def capture_queries():
+    """Перехватывает запросы ко всем базам из DATABASES, включая реплики."""
+    # В тестах зеркало и его база делят одно соединение.
+    unique = {
+        id(connections[alias]): connections[alias] for alias in connections
+    }
+    with ExitStack() as stack:
+        yield [
+            stack.enter_context(CaptureQueriesContext(connection))
+            for connection in unique.values()
+        ]
+
+
+@pytest.fixture
+def query_budgets():
+    """Допустимое число запросов для каждого адреса из URL."""
+    return json.loads(QUERY_BUDGETS.read_text())
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Возвращает функцию, которая наполняет базу данными растущего объёма
+    и для каждого объёма считает запросы при загрузке страницы.
+    """
+    def count(client, url, seed, sizes, user=None):
+        counts = []
+        for size in sizes:
+            seed(size)
+            cache.clear()
+            if user is not None:
+                # Страница выхода разлогинивает клиента, входим заново.
+                client.force_login(user)
+            with capture_queries() as contexts:
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            counts.append(sum(len(context) for context in contexts))
+        return counts
+    return count
+
+
 @pytest.fixture
 def author(django_user_model):
     return django_user_model.objects.create(username='Autor')
@@ -87,14 +164,23 @@ def comment(author, news):
 
 @pytest.fixture
 def comments_list(author, news):
-    for i in range(3):
-        comment = Comment.objects.create(
-            news=news,
-            author=author,
-            text=f'Комментарий {i}',
-        )
-        comment.created = timezone.now() + timedelta(days=i)
-        comment.save()
+    """
+    Комментарии с разным временем создания, собранные пакетно.
+
+    Сигналы при пакетной вставке не срабатывают, поэтому счётчик
+    и поисковый индекс обновляются здесь же.
+    """
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {i}')
+        for i in range(3)
+    )
+    comments_list = list(Comment.objects.filter(news=news).order_by('pk'))
+    now = timezone.now()
+    for i, comment in enumerate(comments_list):
+        comment.created = now + timedelta(days=i)
+    Comment.objects.bulk_update(comments_list, ('created',))
+    News.objects.filter(pk=news.pk).update(comment_count=len(comments_list))
+    index_comments(comments_list)
     return comments_list
 
 
@@ -5,3 +5,11 @@ class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .forms import BAD_WORDS
+        from .moderation import get_matcher
+
+        # Индекс запрещённых слов строится при запуске, а не на первом POST.
+        get_matcher(BAD_WORDS)
@@ -0,0 +1,130 @@
+"""
+Асинхронные варианты ленты и страницы новости для ASGI.
+
+В Django 3.2 нет асинхронного ORM, поэтому запросы к базе и кэшу
+выполняются в отдельном пуле из NEWS_ASYNC_DB_THREADS потоков: он
+ограничивает число одновременных соединений и не занимает общий
+поток sync_to_async. Шаблон рендерится уже в цикле событий.
+Условные GET-запросы обрабатываются с теми же ETag, что и в
+синхронных представлениях.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .cache import get_home_page, home_page_key, set_home_page
+from .freshness import news_detail_etag, news_list_etag
+from .views import NewsDetail, NewsDetailView, NewsList
+
+DB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.NEWS_ASYNC_DB_THREADS,
+    thread_name_prefix='news-db',
+)
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def _run(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # Соединения потоков пула живут по тем же правилам CONN_MAX_AGE.
+        close_old_connections()
+
+
+async def run_in_db_thread(func, *args):
+    """Выполняет синхронный код с ORM в пуле DB_EXECUTOR."""
+    return await sync_to_async(
+        _run, thread_sensitive=False, executor=DB_EXECUTOR
+    )(func, *args)
+
+
+def async_condition(etag_func):
+    """
+    Асинхронный аналог декоратора condition(etag_func=...).
+
+    ETag считается в пуле DB_EXECUTOR; для совпавшего ETag
+    представление не вызывается и отдаётся ответ 304.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return await view(request, *args, **kwargs)
+            etag = await run_in_db_thread(
+                partial(etag_func, request, *args, **kwargs)
+            )
+            etag = quote_etag(etag) if etag else None
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return inner
+    return decorator
+
+
+def load_news_list(request):
+    """Готовит контекст ленты, а для анонимов сначала ищет её в кэше."""
+    view = NewsList()
+    view.setup(request)
+    key = None
+    if not request.user.is_authenticated:
+        key = home_page_key(request.GET.get('after'))
+        content = get_home_page(key)
+        if content is not None:
+            return key, content, None
+    view.object_list = view.get_queryset()
+    return key, None, view.get_context_data()
+
+
+@async_condition(news_list_etag)
+async def news_list(request):
+    """Асинхронный вариант NewsList."""
+    key, content, context = await run_in_db_thread(load_news_list, request)
+    if content is not None:
+        return HttpResponse(content)
+    response = render(request, NewsList.template_name, context)
+    if key is not None:
+        await run_in_db_thread(set_home_page, key, response.content)
+    return response
+
+
+news_list.replica_reads = True
+
+
+def load_news_detail(request, pk):
+    """
+    Контекст страницы новости.
+
+    get_context_data проверяет request.user, поэтому пользователь
+    загружается здесь, а не при рендеринге в цикле событий.
+    """
+    view = NewsDetail()
+    view.setup(request, pk=pk)
+    view.object = view.get_object()
+    return view.get_context_data(object=view.object)
+
+
+@async_condition(news_detail_etag)
+async def news_detail(request, pk):
+    """
+    Асинхронный вариант NewsDetail.
+
+    Отправка комментария остаётся синхронной: форма и сигналы
+    пишут в базу, выигрыша от асинхронности там нет.
+    """
+    if request.method not in SAFE_METHODS:
+        return await sync_to_async(NewsDetailView.as_view())(request, pk=pk)
+    context = await run_in_db_thread(load_news_detail, request, pk)
+    return render(request, NewsDetail.template_name, context)
+
+
+news_detail.replica_reads = True
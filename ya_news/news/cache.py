@@ -0,0 +1,69 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+
+from yacommon.cache import incr_counter
+
+HOME_PAGE_VERSION_KEY = 'news:home:version'
+HOME_PAGE_HITS_KEY = 'news:home:hits'
+HOME_PAGE_MISSES_KEY = 'news:home:misses'
+
+
+def home_page_version():
+    """
+    Версия кэша главной страницы.
+
+    Начальное значение берётся из текущего времени, чтобы после вытеснения
+    ключа версии не отдать страницы, сохранённые под старыми номерами.
+    """
+    return cache.get_or_set(
+        HOME_PAGE_VERSION_KEY, int(time.time() * 1000), None
+    )
+
+
+def bump_home_page_version():
+    """Сбрасывает все закэшированные варианты главной страницы."""
+    try:
+        cache.incr(HOME_PAGE_VERSION_KEY)
+    except ValueError:
+        home_page_version()
+
+
+def home_page_key(cursor=None):
+    """
+    Ключ кэша для страницы ленты, начинающейся с курсора.
+
+    Ключ не требует запросов к базе: свежесть ленты отражает версия,
+    которую увеличивают сигналы и команды с массовыми изменениями.
+    """
+    cursor_hash = md5((cursor or '').encode()).hexdigest()
+    return f'news:home:{home_page_version()}:{cursor_hash}'
+
+
+def get_home_page(key):
+    """Возвращает содержимое страницы из кэша и учитывает попадание."""
+    content = cache.get(key)
+    incr_counter(
+        HOME_PAGE_MISSES_KEY if content is None else HOME_PAGE_HITS_KEY
+    )
+    return content
+
+
+def set_home_page(key, content):
+    cache.set(key, content, settings.NEWS_HOME_CACHE_TIMEOUT)
+
+
+def home_page_stats(reset=False):
+    """Счётчики попаданий и промахов кэша главной страницы."""
+    hits = cache.get(HOME_PAGE_HITS_KEY, 0)
+    misses = cache.get(HOME_PAGE_MISSES_KEY, 0)
+    if reset:
+        cache.delete_many((HOME_PAGE_HITS_KEY, HOME_PAGE_MISSES_KEY))
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
@@ -0,0 +1,190 @@
+"""
+Публикация новых комментариев для подписчиков server-sent events.
+
+Поток включается настройкой NEWS_EVENTS, а брокер выбирается
+NEWS_EVENTS_BROKER. InProcessBroker доставляет события только
+подписчикам своего процесса: с ним сайт должен работать в одном
+процессе, иначе читатели на других воркерах не увидят новых комментариев.
+"""
+import itertools
+import json
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque, namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.utils import formats, timezone
+from django.utils.module_loading import import_string
+
+Event = namedtuple('Event', ('id', 'data'))
+
+
+class Subscription:
+    """Очередь событий одного подписчика."""
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue()
+
+    def get(self, timeout):
+        """Следующее событие или None, если за timeout секунд его нет."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker(ABC):
+    """
+    Интерфейс брокера.
+
+    publish возвращает идентификатор события; идентификаторы растут,
+    чтобы переподключившийся клиент мог передать последний полученный
+    в subscribe и получить пропущенное.
+    """
+
+    @abstractmethod
+    def publish(self, channel, data):
+        pass
+
+    @abstractmethod
+    def subscribe(self, channel, last_event_id=None):
+        pass
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        pass
+
+
+class InProcessBroker(Broker):
+    """
+    Брокер в памяти процесса.
+
+    Для каждого канала хранится NEWS_EVENTS_HISTORY последних событий,
+    а число каналов ограничено NEWS_EVENTS_CHANNELS: давно не
+    использованные каналы без подписчиков забываются.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.channels = OrderedDict()
+
+    def _channel(self, name):
+        channel = self.channels.get(name)
+        if channel is None:
+            self._evict()
+            channel = self.channels[name] = {
+                'history': deque(maxlen=settings.NEWS_EVENTS_HISTORY),
+                'subscribers': set(),
+            }
+        self.channels.move_to_end(name)
+        return channel
+
+    def _evict(self):
+        excess = len(self.channels) + 1 - settings.NEWS_EVENTS_CHANNELS
+        if excess <= 0:
+            return
+        idle = [
+            name for name, channel in self.channels.items()
+            if not channel['subscribers']
+        ]
+        for name in idle[:excess]:
+            del self.channels[name]
+
+    def publish(self, channel, data):
+        with self.lock:
+            event = Event(next(self.ids), data)
+            state = self._channel(channel)
+            state['history'].append(event)
+            for subscription in state['subscribers']:
+                subscription.queue.put(event)
+        return event.id
+
+    def subscribe(self, channel, last_event_id=None):
+        subscription = Subscription(self, channel)
+        with self.lock:
+            state = self._channel(channel)
+            if last_event_id is not None:
+                for event in state['history']:
+                    if event.id > last_event_id:
+                        subscription.queue.put(event)
+            state['subscribers'].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            state = self.channels.get(subscription.channel)
+            if state is not None:
+                state['subscribers'].discard(subscription)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.NEWS_EVENTS_BROKER)()
+
+
+def news_channel(news_pk):
+    return f'news:{news_pk}'
+
+
+def publish_comment(comment):
+    """Отправляет подписчикам новости данные нового комментария."""
+    created = formats.date_format(
+        timezone.localtime(comment.created), 'DATETIME_FORMAT'
+    )
+    return get_broker().publish(news_channel(comment.news_id), {
+        'id': comment.pk,
+        'author': str(comment.author),
+        'created': created,
+        'text': comment.text,
+    })
+
+
+def format_event(event):
+    """Событие в формате text/event-stream."""
+    data = json.dumps(event.data, ensure_ascii=False)
+    return f'id: {event.id}\nevent: comment\ndata: {data}\n\n'
+
+
+def comment_stream(news_pk, last_event_id=None):
+    """
+    Поток новых комментариев к новости.
+
+    Между событиями раз в NEWS_EVENTS_KEEPALIVE секунд уходит
+    комментарий-пинг, чтобы прокси не закрыли соединение. Через
+    NEWS_EVENTS_MAX_DURATION секунд поток завершается, и браузер
+    переподключается с Last-Event-ID, не теряя событий.
+    """
+    # Поток не обращается к базе и может жить минутами, поэтому
+    # соединения отпускаем сразу. Внутри транзакции их трогать нельзя.
+    for connection in connections.all():
+        if not connection.in_atomic_block:
+            connection.close()
+    subscription = get_broker().subscribe(
+        news_channel(news_pk), last_event_id
+    )
+    deadline = time.monotonic() + settings.NEWS_EVENTS_MAX_DURATION
+    try:
+        yield f'retry: {settings.NEWS_EVENTS_RETRY}\n\n'
+        while True:
+            remaining = deadline - time.monotonic()
+            event = subscription.get(
+                max(0, min(settings.NEWS_EVENTS_KEEPALIVE, remaining))
+            )
+            if event is not None:
+                yield format_event(event)
+            elif remaining <= 0:
+                break
+            else:
+                yield ': keepalive\n\n'
+    finally:
+        subscription.close()
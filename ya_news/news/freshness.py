@@ -0,0 +1,49 @@
+"""
+ETag для условных GET-запросов к ленте и странице новости.
+
+ETag строится только по данным из базы, поэтому все процессы отдают
+одинаковый ответ независимо от своего кэша. Правка комментария
+меняет updated_at новости. Last-Modified не отдаём: ETag ленты
+зависит ещё и от состава страницы.
+"""
+from django.conf import settings
+
+from yacommon.cache import make_etag
+
+from .models import News
+from .pagination import keyset_page
+
+
+def news_list_etag(request, *args, **kwargs):
+    """
+    Состав и время правки новостей показываемой страницы ленты.
+
+    Запрос идёт по тому же индексу, что и сама лента, и не читает
+    таблицу комментариев.
+    """
+    news, _ = keyset_page(
+        News.objects.only('id', 'date', 'updated_at'),
+        'date',
+        request.GET.get('after'),
+        settings.NEWS_COUNT_ON_HOME_PAGE + 1,
+        descending=True,
+    )
+    return make_etag(
+        request.user.pk,
+        request.GET.urlencode(),
+        *((item.pk, item.updated_at.isoformat()) for item in news),
+    )
+
+
+def news_detail_etag(request, pk, *args, **kwargs):
+    """Время правки новости и счётчик её комментариев."""
+    freshness = News.objects.filter(pk=pk).values_list(
+        'updated_at', 'comment_count'
+    ).first()
+    if freshness is None:
+        return None
+    return make_etag(
+        request.user.pk,
+        request.GET.urlencode(),
+        *freshness,
+    )
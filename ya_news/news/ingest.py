@@ -0,0 +1,202 @@
+import json
+from itertools import groupby, islice
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .cache import bump_home_page_version
+from .models import News, SearchToken
+from .search import index_news_list
+
+CHUNK_SIZE = 64 * 1024
+NEWS_FIELDS = ('title', 'text', 'date')
+NEWS_MODEL = 'news.news'
+_decoder = json.JSONDecoder()
+
+
+class JsonArrayReader:
+    """
+    Читает элементы JSON-массива по одному, не загружая файл целиком.
+
+    В памяти держится только текущий фрагмент файла.
+    """
+
+    def __init__(self, file, chunk_size=CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer, self.position, self.eof = '', 0, False
+
+    def __iter__(self):
+        self.expect('[')
+        if self.next_char() == ']':
+            return
+        while True:
+            yield self.next_item()
+            if self.expect(',]') == ']':
+                return
+
+    def read_more(self):
+        chunk = self.file.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def next_char(self):
+        """Следующий значимый символ; позиция остаётся перед ним."""
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position].isspace()
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.eof:
+                raise ValueError('Неожиданный конец JSON-массива.')
+            self.read_more()
+
+    def expect(self, chars):
+        char = self.next_char()
+        if char not in chars:
+            raise ValueError(f'Ожидалось {chars!r}, получено {char!r}.')
+        self.position += 1
+        return char
+
+    def next_item(self):
+        self.next_char()
+        while True:
+            try:
+                item, end = _decoder.raw_decode(self.buffer, self.position)
+            except ValueError:
+                if self.eof:
+                    raise
+            else:
+                # Элемент в конце фрагмента может продолжаться дальше.
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return item
+            self.read_more()
+
+
+def iter_ndjson(file):
+    """Читает объекты из файла, где каждая непустая строка — JSON."""
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def build_news(record):
+    """
+    Создаёт новость из записи и проверяет значения полей.
+
+    Поддерживаются записи фикстур Django ({"pk": ..., "fields": {...}})
+    и плоские объекты с полями модели и необязательным id. Поля,
+    которые есть в записи, запоминаются в import_fields: при обновлении
+    меняются только они. Запись с id проверяется здесь только по этим
+    полям, остальные проверяются, если новость окажется новой.
+    """
+    if not isinstance(record, dict):
+        raise ValidationError('Запись должна быть JSON-объектом.')
+    if record.get('model', NEWS_MODEL) != NEWS_MODEL:
+        raise ValidationError(
+            f'Запись модели {record["model"]}, ожидается {NEWS_MODEL}.'
+        )
+    pk = record.get('pk', record.get('id'))
+    fields = record.get('fields', record)
+    unknown = set(fields) - set(NEWS_FIELDS) - {'pk', 'id', 'model'}
+    if unknown:
+        raise ValidationError(f'Неизвестные поля: {", ".join(unknown)}.')
+    news = News(pk=pk, **{
+        name: fields[name] for name in NEWS_FIELDS if name in fields
+    })
+    news.import_fields = tuple(name for name in NEWS_FIELDS if name in fields)
+    news.clean_fields(exclude=(
+        None if pk is None
+        else [name for name in NEWS_FIELDS if name not in fields]
+    ))
+    return news
+
+
+def split_batch(batch, existing):
+    """
+    Делит пакет на новые и уже существующие новости.
+
+    Повторы id внутри пакета и новые новости без обязательных полей
+    возвращаются списком ошибок.
+    """
+    new, updated, errors, seen = [], [], [], set()
+    for news in batch:
+        if news.pk in seen:
+            errors.append(f'Новость {news.pk}: id повторяется в пакете.')
+            continue
+        if news.pk is not None:
+            seen.add(news.pk)
+        if news.pk in existing:
+            updated.append(news)
+            continue
+        try:
+            news.clean_fields()
+        except ValidationError as error:
+            errors.append(f'Новость {news.pk}: {error}')
+        else:
+            new.append(news)
+    return new, updated, errors
+
+
+def update_news(updated):
+    """Обновляет у каждой новости только поля, пришедшие в записи."""
+    # bulk_update не заполняет auto_now, ставим время правки сами.
+    now = timezone.now()
+    for news in updated:
+        news.updated_at = now
+    key = attrgetter('import_fields')
+    for fields, group in groupby(sorted(updated, key=key), key):
+        News.objects.bulk_update(list(group), (*fields, 'updated_at'))
+
+
+def save_batch(batch, upsert=False):
+    """
+    Сохраняет пакет новостей в одной транзакции.
+
+    Новости с уже существующим id обновляются при upsert и пропускаются
+    без него. Сигналы при массовой вставке не отправляются, поэтому
+    поисковый индекс и кэш ленты обновляются здесь же.
+    Возвращает число созданных и обновлённых новостей и список ошибок.
+    """
+    with transaction.atomic():
+        existing = set(News.objects.filter(
+            pk__in=[news.pk for news in batch if news.pk is not None]
+        ).values_list('pk', flat=True))
+        new, updated, errors = split_batch(batch, existing)
+        created = len(new)
+        last_pk = News.objects.aggregate(last=Max('pk'))['last'] or 0
+        News.objects.bulk_create(new)
+        if upsert and updated:
+            update_news(updated)
+            SearchToken.objects.filter(
+                news__in=updated, comment__isnull=True
+            ).delete()
+        else:
+            updated = []
+        # Заголовок и текст для индекса берём из базы: запись могла
+        # содержать не все поля.
+        indexed = Q(pk__in=[
+            news.pk for news in [*new, *updated] if news.pk is not None
+        ])
+        if any(news.pk is None for news in new):
+            # База не вернула id вставленных строк.
+            indexed |= Q(pk__gt=last_pk)
+        index_news_list(
+            News.objects.filter(indexed).only('id', 'title', 'text')
+        )
+    bump_home_page_version()
+    return created, len(updated), errors
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
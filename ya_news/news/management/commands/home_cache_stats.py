@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from news.cache import home_page_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша главной страницы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        stats = home_page_stats(reset=options['reset'])
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {stats["hit_rate"]:.1%}'
+        )
@@ -0,0 +1,94 @@
+import resource
+import sys
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from news.ingest import (
+    JsonArrayReader,
+    batched,
+    build_news,
+    iter_ndjson,
+    save_batch,
+)
+
+MAX_REPORTED_ERRORS = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает новости из JSON-массива или NDJSON '
+        'пакетами через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с новостями или - для stdin.')
+        parser.add_argument(
+            '--format',
+            choices=('json', 'ndjson'),
+            help='Формат файла; по умолчанию определяется по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Число новостей в одной вставке и транзакции.',
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Обновлять новости с уже существующим id, а не пропускать.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'json'
+        )
+        reader = iter_ndjson if file_format == 'ndjson' else JsonArrayReader
+        file = (
+            sys.stdin if path == '-' else open(path, encoding='utf-8')
+        )
+        started = time.perf_counter()
+        created = updated = self.invalid = 0
+        try:
+            for batch in batched(
+                self.valid_news(reader(file)), options['batch_size']
+            ):
+                batch_created, batch_updated, errors = save_batch(
+                    batch, options['upsert']
+                )
+                created += batch_created
+                updated += batch_updated
+                for error in errors:
+                    self.reject(error)
+        except ValueError as error:
+            raise CommandError(f'Ошибка разбора {path}: {error}')
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        elapsed = time.perf_counter() - started
+        total = created + updated + self.invalid
+        # На Linux ru_maxrss измеряется в килобайтах.
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: {created}, обновлено: {updated}, '
+            f'пропущено с ошибками: {self.invalid}.\n'
+            f'Записей в секунду: {total / elapsed:.0f}, '
+            f'пиковая память: {peak_rss / 1024:.1f} МБ.'
+        ))
+
+    def valid_news(self, records):
+        """Пропускает записи с ошибками, сообщая о первых из них."""
+        for number, record in enumerate(records, 1):
+            try:
+                yield build_news(record)
+            except (ValidationError, TypeError) as error:
+                self.reject(f'Запись {number}: {error}')
+
+    def reject(self, message):
+        """Учитывает отклонённую запись, сообщая о первых из них."""
+        self.invalid += 1
+        if self.invalid <= MAX_REPORTED_ERRORS:
+            self.stderr.write(message)
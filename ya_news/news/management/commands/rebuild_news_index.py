@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.models import Comment, News, SearchToken
+from news.search import index_comments, index_news_list
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс новостей и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пакета при чтении объектов и записи индекса.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            SearchToken.objects.all().delete()
+            index_news_list(
+                News.objects.only('id', 'title', 'text').iterator(
+                    chunk_size=batch_size
+                ),
+                batch_size,
+            )
+            index_comments(
+                Comment.objects.only('id', 'news', 'text').iterator(
+                    chunk_size=batch_size
+                ),
+                batch_size,
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в индексе: {SearchToken.objects.count()}'
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+from news.cache import bump_home_page_version
+from news.models import Comment, News
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у новостей.'
+
+    def handle(self, *args, **options):
+        counts = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            total=Count('pk')
+        ).values('total')
+        updated = News.objects.update(
+            comment_count=Coalesce(Subquery(counts), 0),
+            updated_at=Now(),
+        )
+        # update() не посылает сигналов, поэтому кэш ленты сбрасываем сами.
+        bump_home_page_version()
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено новостей: {updated}')
+        )
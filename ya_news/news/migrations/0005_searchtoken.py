@@ -0,0 +1,28 @@
+# Generated by Django 3.2.15 on 2026-10-17 04:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_comment_news_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=50)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('comment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='news.comment')),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='news.news')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchtoken',
+            index=models.Index(fields=['token', 'news'], name='search_token_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-17 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_searchtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
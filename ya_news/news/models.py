@@ -8,9 +8,15 @@ class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Меняется и при правке комментариев, по нему строится ETag.
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -32,6 +38,37 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+
+class SearchToken(models.Model):
+    """Слово новости или комментария к ней в поисковом индексе."""
+    news = models.ForeignKey(
+        News,
+        on_delete=models.CASCADE,
+        related_name='tokens',
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    token = models.CharField(max_length=50)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('token', 'news'), name='search_token_idx'),
+        )
+
+    def __str__(self):
+        return self.token
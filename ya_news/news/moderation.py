@@ -0,0 +1,143 @@
+import os
+import re
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_cache = {'key': None, 'matcher': None}
+
+# Латинские буквы и цифры, которыми подменяют похожие кириллические.
+HOMOGLYPHS = str.maketrans({
+    'a': 'а', 'b': 'в', 'c': 'с', 'e': 'е', 'h': 'н', 'k': 'к', 'm': 'м',
+    'o': 'о', 'p': 'р', 'r': 'г', 't': 'т', 'u': 'и', 'x': 'х', 'y': 'у',
+    'ё': 'е', '0': 'о', '3': 'з', '4': 'ч', '6': 'б', '@': 'а',
+})
+SEPARATORS = re.compile(r'[\W\d_]+')
+SPACED_LETTERS = re.compile(r'\b(?:\w\s+){2,}\w\b')
+WHITESPACE = re.compile(r'\s+')
+# Окончания, отбрасываемые при построении основ, от длинных к коротким.
+ENDINGS = (
+    'иями', 'ями', 'ами', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими',
+    'ая', 'яя', 'ое', 'ее', 'ие', 'ые', 'ой', 'ей', 'ий', 'ый', 'ом', 'ем',
+    'ам', 'ям', 'ах', 'ях', 'ою', 'ею', 'ую', 'юю', 'ов', 'ев',
+    'а', 'я', 'о', 'е', 'и', 'ы', 'у', 'ю', 'ь', 'й',
+)
+MIN_STEM_LENGTH = 4
+
+
+def normalize(text):
+    """
+    Приводит текст к виду, в котором ищутся запрещённые слова.
+
+    Строчные буквы, латинские двойники заменены кириллицей,
+    знаки и цифры внутри слов удалены, а слова, набранные
+    по одной букве через пробел, склеены.
+    """
+    text = text.lower().translate(HOMOGLYPHS)
+    text = SEPARATORS.sub(
+        lambda match: ' ' if WHITESPACE.search(match.group()) else '', text
+    )
+    return SPACED_LETTERS.sub(
+        lambda match: WHITESPACE.sub('', match.group()), text
+    )
+
+
+@lru_cache(maxsize=100_000)
+def stem(word, endings=ENDINGS):
+    """Отбрасывает окончание, чтобы основа совпадала со всеми формами."""
+    for ending in endings:
+        if (
+            word.endswith(ending)
+            and len(word) - len(ending) >= MIN_STEM_LENGTH
+        ):
+            return word[:-len(ending)]
+    return word
+
+
+def build_pattern(words):
+    """
+    Собирает слова в одно регулярное выражение по префиксному дереву.
+
+    Общие префиксы проверяются один раз, поэтому время поиска зависит
+    от длины текста, а не от количества слов в списке.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return re.compile(_trie_regex(trie))
+
+
+def _trie_regex(node):
+    if '' in node:
+        # Короткое слово уже найдено, его продолжения проверять не нужно.
+        return ''
+    alternatives = [
+        re.escape(char) + _trie_regex(child)
+        for char, child in sorted(node.items())
+    ]
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return '(?:' + '|'.join(alternatives) + ')'
+
+
+class BadWordsMatcher:
+    """
+    Поиск запрещённых слов в тексте за один проход.
+
+    Индекс строится один раз по основам нормализованных слов,
+    поэтому находятся и другие словоформы, и замаскированные написания.
+    """
+
+    def __init__(self, words):
+        stems = {stem(normalize(word).strip()) for word in words} - {''}
+        self.stems = frozenset(stems)
+        self.pattern = build_pattern(self.stems) if stems else None
+
+    def search(self, text):
+        """Возвращает первую найденную основу или None."""
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(normalize(text))
+        return match.group() if match else None
+
+
+def read_words_file(path):
+    """Слова из файла, по одному в строке; строки с # пропускаются."""
+    with open(path, encoding='utf-8') as file:
+        return [
+            line for line in file.read().splitlines()
+            if not line.startswith('#')
+        ]
+
+
+def get_matcher(words):
+    """
+    Возвращает закэшированный поисковик по словам и файлу BAD_WORDS_FILE.
+
+    Файл проверяется по времени изменения, поэтому правки списка
+    применяются без перезапуска сервера.
+    """
+    path = settings.BAD_WORDS_FILE
+    try:
+        stat = os.stat(path) if path else None
+    except FileNotFoundError:
+        stat = None
+    key = (id(words), path, stat and (stat.st_mtime_ns, stat.st_size))
+    if _cache['key'] != key:
+        with _lock:
+            if _cache['key'] != key:
+                extra = read_words_file(path) if stat else ()
+                _cache['matcher'] = BadWordsMatcher((*words, *extra))
+                _cache['key'] = key
+    return _cache['matcher']
+
+
+def reload_matcher():
+    """Сбрасывает кэш, следующий вызов get_matcher перечитает источники."""
+    with _lock:
+        _cache['key'] = None
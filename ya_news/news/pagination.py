@@ -0,0 +1,83 @@
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+INVALID_CURSOR = 'Некорректный курсор страницы.'
+SCALARS = (str, int, float)
+# Целые, которые база хранит в 64 битах.
+INT64 = range(-2 ** 63, 2 ** 63)
+
+
+def encode_cursor(value, pk):
+    """Упаковывает позицию в списке в непрозрачную строку."""
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    raw = json.dumps([value, pk], separators=(',', ':')).encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def check_number(value):
+    """Не даёт передать в базу бесконечность, NaN или слишком большое целое."""
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(INVALID_CURSOR)
+    if isinstance(value, int) and value not in INT64:
+        raise ValueError(INVALID_CURSOR)
+    return value
+
+
+def decode_cursor(cursor, model, field):
+    """
+    Восстанавливает позицию из курсора, приводя значение к типу поля.
+
+    Значение должно быть скаляром, отличным от null; поле, которого нет
+    в модели, — аннотация вроде ранга поиска, его значение числовое.
+    Числа должны быть конечными и умещаться в 64 бита, pk — целое.
+    """
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, pk = json.loads(raw)
+        if isinstance(value, bool) or not isinstance(value, SCALARS):
+            raise ValueError(INVALID_CURSOR)
+        if isinstance(pk, bool) or not isinstance(pk, int):
+            raise ValueError(INVALID_CURSOR)
+        check_number(value)
+        try:
+            value = model._meta.get_field(field).to_python(value)
+        except FieldDoesNotExist:
+            value = float(value)
+        if value is None:
+            raise ValueError(INVALID_CURSOR)
+        return check_number(value), check_number(pk)
+    except (
+        BinasciiError, OverflowError, TypeError, ValueError, ValidationError
+    ):
+        raise Http404(INVALID_CURSOR)
+
+
+def keyset_page(queryset, field, cursor, size, descending=False):
+    """
+    Возвращает страницу объектов и курсор следующей страницы.
+
+    Вместо OFFSET список продолжается с последней показанной пары
+    (field, pk), поэтому стоимость страницы не зависит от её глубины.
+    """
+    lookup, prefix = ('lt', '-') if descending else ('gt', '')
+    queryset = queryset.order_by(f'{prefix}{field}', f'{prefix}pk')
+    if cursor:
+        value, pk = decode_cursor(cursor, queryset.model, field)
+        # Отдельное нестрогое условие по полю даёт базе диапазон
+        # для поиска по составному индексу.
+        queryset = queryset.filter(
+            Q(**{f'{field}__{lookup}e': value}),
+            Q(**{f'{field}__{lookup}': value}) | Q(**{f'pk__{lookup}': pk}),
+        )
+    objects = list(queryset[:size + 1])
+    if len(objects) <= size:
+        return objects, None
+    last = objects[size - 1]
+    return objects[:size], encode_cursor(getattr(last, field), last.pk)
@@ -1,11 +1,23 @@
+import asyncio
 from datetime import date
+from http import HTTPStatus
 
 import pytest
+from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import QueryDict
+from django.urls import reverse
 from django.utils import timezone
 
-from conftest import URL
+from conftest import URL, COMMENT_TEXT, NEW_COMMENT_TEXT
+from news.async_views import news_detail, news_list
+from news.cache import home_page_stats
 from news.forms import CommentForm
+from news.models import Comment, News
+from news.pagination import encode_cursor
+from yacommon.metrics import MetricsMiddleware
 
 pytestmark = pytest.mark.django_db
 
@@ -21,6 +33,66 @@ def test_news_count_order(client, news_list):
     )
 
 
+def test_news_next_page(client, news_list):
+    """Проверка перехода на следующую страницу новостей по курсору."""
+    first_page = client.get(URL.home).context
+    response = client.get(URL.home, {'after': first_page['next_cursor']})
+    next_list = list(response.context['object_list'])
+    assert len(next_list) == len(news_list) - settings.NEWS_COUNT_ON_HOME_PAGE
+    assert not set(next_list) & set(first_page['object_list'])
+    assert next_list[0].date <= first_page['object_list'][-1].date
+    assert response.context['next_cursor'] is None
+
+
+@pytest.mark.parametrize('url', (URL.home, URL.search))
+@pytest.mark.parametrize(
+    'cursor',
+    (
+        'not-a-cursor',
+        encode_cursor(None, 1),
+        encode_cursor(['2022-11-01'], 1),
+        encode_cursor(True, 1),
+        encode_cursor('2022-11-01', None),
+        encode_cursor('не число', 1),
+        encode_cursor('2022-11-01', 1e400),
+        encode_cursor('2022-11-01', 10 ** 23),
+        encode_cursor('2022-11-01', '1'),
+        encode_cursor(float('nan'), 1),
+        encode_cursor(1e400, 1),
+        encode_cursor('nan', 1),
+        encode_cursor(10 ** 23, 1),
+    ),
+)
+def test_news_bad_cursor(client, url, cursor):
+    """Некорректный курсор возвращает ошибку 404."""
+    response = client.get(url, {'after': cursor, 'q': 'новость'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_home_page_loads_no_comments(
+    client, news_list, comments_list, django_assert_num_queries
+):
+    """Лента строится одним запросом без чтения комментариев."""
+    # ETag ленты и сама страница.
+    with django_assert_num_queries(2) as queries:
+        response = client.get(URL.home)
+    assert 'Комментариев: 3' in response.content.decode()
+    assert not any(
+        'news_comment' in query['sql'] for query in queries.captured_queries
+    )
+
+
+def test_home_page_cache(client, news, author, django_assert_num_queries):
+    """Повторный запрос ленты отдаётся из кэша до её изменения."""
+    home_page_stats(reset=True)
+    content = client.get(URL.home).content
+    with django_assert_num_queries(1):
+        assert client.get(URL.home).content == content
+    Comment.objects.create(news=news, author=author, text=COMMENT_TEXT)
+    assert 'Комментариев: 1' in client.get(URL.home).content.decode()
+    assert home_page_stats() == {'hits': 1, 'misses': 2, 'hit_rate': 1 / 3}
+
+
 def test_comments_order(client, news, comments_list):
     """Проверка сортировки комментариев."""
     response = client.get(URL.detail)
@@ -31,6 +103,20 @@ def test_comments_order(client, news, comments_list):
     assert all_comments == sorted(all_comments, key=lambda x: x.created)
 
 
+def test_comments_pages(client, news, comments_list, settings):
+    """Комментарии отдаются страницами: первая с новостью, далее фрагмент."""
+    settings.COMMENTS_COUNT_ON_PAGE = 2
+    context = client.get(URL.detail).context
+    first_page = context['comments']
+    assert len(first_page) == settings.COMMENTS_COUNT_ON_PAGE
+    response = client.get(context['next_comments_fragment_url'])
+    next_page = response.context['comments']
+    assert 'next_comments_url' not in response.context
+    assert first_page + next_page == list(news.comment_set.all())
+    missing = reverse('news:comments', args=(news.pk + 1,))
+    assert client.get(missing).status_code == HTTPStatus.NOT_FOUND
+
+
 def test_client_has_form(client, admin_client, news):
     """Проверка доступности формы комментария и её типа."""
     response = client.get(URL.detail)
@@ -39,3 +125,83 @@ def test_client_has_form(client, admin_client, news):
         isinstance(admin_response.context['form'], CommentForm)
         and 'form' not in response.context
     )
+
+
+def test_search_ranking(client, author, settings):
+    """Поиск ранжирует новости и листается по курсору."""
+    settings.NEWS_SEARCH_COUNT_ON_PAGE = 1
+    in_text = News.objects.create(title='Обычная', text='Про рекурсию')
+    in_title = News.objects.create(title='Рекурсия', text='Текст')
+    in_comment = News.objects.create(title='Другая', text='Текст')
+    Comment.objects.create(news=in_comment, author=author, text='рекурсия')
+    found = []
+    params = {'q': 'Рекурсия'}
+    while params:
+        response = client.get(URL.search, params)
+        found.extend(response.context['object_list'])
+        next_url = response.context.get('next_url')
+        params = next_url and dict(QueryDict(next_url[1:]).items())
+    assert found[0] == in_title
+    assert set(found) == {in_title, in_text, in_comment}
+
+
+def test_search_index_follows_comments(client, comment):
+    """Удалённый комментарий пропадает из поиска."""
+    params = {'q': 'комментарий'}
+    assert len(client.get(URL.search, params).context['object_list']) == 1
+    comment.delete()
+    assert not client.get(URL.search, params).context['object_list']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views(rf, news, comment):
+    """Асинхронные лента и страница новости отдают те же данные."""
+    request = rf.get(URL.home)
+    request.user = AnonymousUser()
+    assert news.title in async_to_sync(news_list)(request).content.decode()
+    request = rf.get(URL.detail)
+    request.user = AnonymousUser()
+    response = async_to_sync(news_detail)(request, pk=news.pk)
+    content = response.content.decode()
+    assert news.title in content
+    assert COMMENT_TEXT in content
+    request = rf.get(URL.detail, HTTP_IF_NONE_MATCH=response['ETag'])
+    request.user = AnonymousUser()
+    response = async_to_sync(news_detail)(request, pk=news.pk)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_metrics(rf, news):
+    """Запросы асинхронного представления из пула потоков считаются."""
+    async def get_response(request):
+        return await news_detail(request, pk=news.pk)
+
+    middleware = MetricsMiddleware(get_response)
+    assert asyncio.iscoroutinefunction(middleware)
+    request = rf.get(URL.detail)
+    request.user = AnonymousUser()
+    response = async_to_sync(middleware)(request)
+    assert 'desc="0 queries"' not in response['Server-Timing']
+
+
+@pytest.mark.parametrize('url', (URL.home, URL.detail))
+def test_conditional_get(client, url, news, comment):
+    """Неизменившаяся страница отдаётся ответом 304 до правки комментария."""
+    etag = client.get(url)['ETag']
+    # ETag не зависит от локального кэша процесса.
+    cache.clear()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    comment.text = NEW_COMMENT_TEXT
+    comment.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_list_etag_follows_page(client, news_list):
+    """Удаление новости со страницы ленты меняет её ETag."""
+    etag = client.get(URL.home)['ETag']
+    News.objects.order_by('-date').first().delete()
+    response = client.get(URL.home, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
@@ -1,11 +1,26 @@
+import json
+import os
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
 
 from conftest import URL, COMMENT_TEXT, NEW_COMMENT_TEXT
+from news.events import get_broker, news_channel
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import Comment, News
+from news.moderation import BadWordsMatcher
+from news.replicas import PIN_COOKIE, ReplicaRouter, read_from_replica
+from yacommon.auth import user_key
+from yacommon.cache import require_shared_cache
+from yacommon.metrics import registry
 
 pytestmark = pytest.mark.django_db
 
@@ -46,6 +61,45 @@ def test_user_cant_use_bad_words(author_client, news, word):
     assert expected_count == comments_count
 
 
+@pytest.mark.parametrize(
+    'text',
+    (
+        'Ты pедиcка!',
+        'р.е.д.и.с.к.а',
+        'р е д и с к а',
+        'с этой редиской',
+        'одни негодяи',
+        'НЕГ0ДЯЕВ хватает',
+    ),
+)
+def test_user_cant_mask_bad_words(author_client, news, text):
+    """Проверка замаскированных и склонённых запрещённых слов."""
+    expected_count = Comment.objects.count()
+    response = author_client.post(URL.detail, data={'text': text})
+    assertFormError(response, form='form', field='text', errors=WARNING)
+    assert expected_count == Comment.objects.count()
+
+
+def test_bad_words_file_reload(author_client, news, settings, tmp_path):
+    """Запрещённые слова из файла применяются без перезапуска."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# список модератора\nбалбес\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    bad_words_data = {'text': 'Какой-то текст, Балбес, еще текст'}
+    response = author_client.post(URL.detail, data=bad_words_data)
+    assertFormError(response, form='form', field='text', errors=WARNING)
+    words_file.write_text('бездельник\n', encoding='utf-8')
+    response = author_client.post(URL.detail, data=bad_words_data)
+    assertRedirects(response, f'{URL.detail}#comments')
+
+
+def test_bad_word_stems():
+    """Основы запрещённых слов не укорачиваются окончаниями поиска."""
+    matcher = BadWordsMatcher(['истерия'])
+    assert matcher.search('без истерии') == 'истери'
+    assert matcher.search('истерзанный') is None
+
+
 def test_author_can_delete_comment(author_client, comment, pk_news):
     """Проверка удаления комментария автором."""
     expected_count = Comment.objects.count() - 1
@@ -88,3 +142,184 @@ def test_user_cant_edit_comment_of_another_user(
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert expected_count == comments_count
     assert all((comment.text == COMMENT_TEXT, comment.author == author))
+
+
+def test_comment_count_follows_comments(author_client, comment, news):
+    """Проверка счётчика комментариев при создании и удалении."""
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    author_client.delete(URL.delete)
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_recount_comments_command(news, comments_list):
+    """Проверка команды пересчёта счётчиков комментариев."""
+    News.objects.update(comment_count=0)
+    call_command('recount_comments')
+    news.refresh_from_db()
+    assert news.comment_count == Comment.objects.filter(news=news).count()
+
+
+@pytest.mark.parametrize('file_name', ('news.json', 'news.ndjson'))
+def test_load_news_command(tmp_path, news, file_name):
+    """Проверка потоковой загрузки новостей с обновлением дубликатов."""
+    News.objects.filter(pk=news.pk).update(date='2022-01-01')
+    records = [
+        {
+            'model': 'news.news',
+            'pk': news.pk,
+            'fields': {'title': 'Обновлено', 'text': 'Текст'},
+        },
+        {'title': 'Новая', 'text': 'Свежий текст', 'date': '2022-11-02'},
+        {'title': 'Без даты', 'text': 'Текст', 'date': 'вчера'},
+        {'model': 'news.comment', 'pk': 100, 'fields': {'text': 'Текст'}},
+    ]
+    path = tmp_path / file_name
+    path.write_text(
+        json.dumps(records) if file_name == 'news.json'
+        else '\n'.join(json.dumps(record) for record in records),
+        encoding='utf-8',
+    )
+    call_command(
+        'load_news', str(path), '--upsert', '--batch-size', '1',
+        stdout=StringIO(), stderr=StringIO(),
+    )
+    news.refresh_from_db()
+    assert news.title == 'Обновлено'
+    assert str(news.date) == '2022-01-01'
+    assert News.objects.count() == 2
+    assert News.objects.filter(tokens__token='свеж').exists()
+
+
+def test_load_news_partial_and_duplicate_records(tmp_path, news):
+    """Частичная запись меняет только свои поля, повтор id отклоняется."""
+    records = [
+        {'id': news.pk, 'title': 'Только заголовок'},
+        {'id': 100, 'title': 'Первая', 'text': 'Текст'},
+        {'id': 100, 'title': 'Вторая', 'text': 'Текст'},
+        {'id': 101, 'title': 'Без текста'},
+    ]
+    path = tmp_path / 'news.ndjson'
+    path.write_text(
+        '\n'.join(json.dumps(record) for record in records), encoding='utf-8'
+    )
+    stderr = StringIO()
+    call_command(
+        'load_news', str(path), '--upsert',
+        stdout=StringIO(), stderr=stderr,
+    )
+    news.refresh_from_db()
+    assert (news.title, news.text) == ('Только заголовок', 'Текст новости')
+    assert News.objects.get(pk=100).title == 'Первая'
+    assert not News.objects.filter(pk=101).exists()
+    assert 'повторяется' in stderr.getvalue()
+    assert News.objects.filter(tokens__token='заголовок').exists()
+
+
+def test_dump_metrics_command(client, settings, tmp_path, news):
+    """Проверка заголовка Server-Timing и сводки метрик по URL."""
+    settings.METRICS_DIR = tmp_path
+    response = client.get(URL.home)
+    assert 'total;dur=' in response['Server-Timing']
+    registry.flush()
+    # Файл давно завершённого процесса.
+    stale = tmp_path / '1.json'
+    stale.write_text(json.dumps({'news:stale': {}}))
+    os.utime(stale, (0, 0))
+    output = StringIO()
+    call_command('dump_metrics', '--json', '--reset', stdout=output)
+    summary = json.loads(output.getvalue())
+    assert summary['news:home']['requests'] >= 1
+    assert 'news:stale' not in summary
+    assert not tmp_path.exists()
+
+
+def test_sqlite_pragmas(settings):
+    """Соединение с SQLite настраивается из SQLITE_PRAGMAS."""
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == settings.SQLITE_PRAGMAS['busy_timeout']
+
+
+def test_replica_router(settings, django_user_model):
+    """Чтение новостей уходит на реплику только внутри read_from_replica."""
+    settings.DATABASE_REPLICAS = ['replica']
+    router = ReplicaRouter()
+    assert router.db_for_read(News) is None
+    with read_from_replica():
+        assert router.db_for_read(News) == 'replica'
+        assert router.db_for_read(django_user_model) is None
+        assert router.db_for_write(News) == 'default'
+    assert router.db_for_read(News) is None
+
+
+def test_write_pins_reads_to_primary(settings, author_client, news, form_data):
+    """После записи чтение идёт из основной базы."""
+    settings.DATABASE_REPLICAS = ['replica']
+    response = author_client.post(URL.detail, data=form_data)
+    assert PIN_COOKIE in response.cookies
+    # Без cookie запрос ушёл бы в несуществующую в тестах реплику.
+    assert author_client.get(URL.detail).status_code == HTTPStatus.OK
+
+
+def test_new_comment_is_streamed(
+    settings, author_client, news, form_data,
+    django_capture_on_commit_callbacks,
+):
+    """Новый комментарий уходит подписчикам и повторяется по Last-Event-ID."""
+    events_url = reverse('news:events', args=(news.pk,))
+    assert author_client.get(events_url).status_code == HTTPStatus.NOT_FOUND
+    assert 'EventSource' not in author_client.get(URL.detail).content.decode()
+    settings.NEWS_EVENTS = True
+    settings.NEWS_EVENTS_MAX_DURATION = 0
+    assert events_url in author_client.get(URL.detail).content.decode()
+    subscription = get_broker().subscribe(news_channel(news.pk))
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(URL.detail, data=form_data)
+    assert subscription.get(0).data['text'] == form_data['text']
+    response = author_client.get(events_url, HTTP_LAST_EVENT_ID='0')
+    assert response['Content-Type'] == 'text/event-stream'
+    content = b''.join(response.streaming_content).decode()
+    assert 'event: comment' in content
+    assert form_data['text'] in content
+
+
+@pytest.mark.parametrize(
+    'session_backend', ('db', 'cached_db', 'signed_cookies')
+)
+def test_cached_user(settings, client, author, comment, session_backend):
+    """Пользователь берётся из кэша, смена пароля завершает сессию."""
+    settings.SESSION_ENGINE = settings.SESSION_BACKENDS[session_backend]
+    settings.AUTH_USER_CACHE = True
+    client.force_login(author)
+    client.get(URL.edit)
+    with CaptureQueriesContext(connection) as context:
+        assert client.get(URL.edit).status_code == HTTPStatus.OK
+    queries = ' '.join(query['sql'] for query in context)
+    assert 'auth_user' not in queries
+    assert ('django_session' in queries) is (session_backend == 'db')
+    author.set_password('Новый пароль')
+    author.save()
+    assert client.get(URL.edit).status_code == HTTPStatus.FOUND
+
+
+def test_cached_inactive_user(settings, author_client, author, comment):
+    """Неактивный пользователь из кэша не считается вошедшим."""
+    settings.AUTH_USER_CACHE = True
+    assert author_client.get(URL.edit).status_code == HTTPStatus.OK
+    author.is_active = False
+    cache.set(user_key(author.pk), author)
+    assert author_client.get(URL.edit).status_code == HTTPStatus.FOUND
+
+
+def test_user_cache_requires_shared_cache(settings, tmp_path):
+    """Кэш пользователей нельзя включить с кэшем одного процесса."""
+    settings.AUTH_USER_CACHE = True
+    with pytest.raises(ImproperlyConfigured):
+        require_shared_cache('AUTH_USER_CACHE')
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+    require_shared_cache('AUTH_USER_CACHE')
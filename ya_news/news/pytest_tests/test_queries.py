@@ -0,0 +1,44 @@
+import pytest
+
+from conftest import PK, URL
+from news.models import Comment, News
+
+pytestmark = pytest.mark.django_db
+
+DATA_SIZES = (1, 5, 20)
+QUERY_PARAMS = {'search': '?q=заголовок'}
+
+
+@pytest.fixture
+def seed(author, django_user_model):
+    """Добавляет новости и комментарии разных авторов к новости PK."""
+    news = News.objects.create(pk=PK, title='Заголовок', text='Текст')
+    Comment.objects.create(pk=PK, news=news, author=author, text='Текст')
+
+    def add(size):
+        for i in range(size):
+            News.objects.create(title=f'Заголовок {size} {i}', text='Текст')
+            Comment.objects.create(
+                news=news,
+                author=django_user_model.objects.create(
+                    username=f'Читатель {size} {i}'
+                ),
+                text=f'Комментарий {i}',
+            )
+    return add
+
+
+@pytest.mark.parametrize('name', URL._fields)
+def test_queries_do_not_grow_with_data(
+    name, client, author, seed, count_queries, query_budgets
+):
+    """Число запросов к БД не зависит от объёма данных."""
+    url = getattr(URL, name) + QUERY_PARAMS.get(name, '')
+    counts = count_queries(client, url, seed, DATA_SIZES, user=author)
+    assert len(set(counts)) == 1, (
+        f'Число запросов для {url} растёт с объёмом данных: {counts}.'
+    )
+    assert counts[0] <= query_budgets[name], (
+        f'Страница {url} выполняет {counts[0]} запросов, '
+        f'бюджет — {query_budgets[name]}.'
+    )
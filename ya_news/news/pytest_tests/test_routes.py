@@ -12,6 +12,7 @@ pytestmark = pytest.mark.django_db
     'url, parametrized_client, expected_status',
     (
         (URL.home, CLIENT, HTTPStatus.OK),
+        (URL.search, CLIENT, HTTPStatus.OK),
         (URL.detail, CLIENT, HTTPStatus.OK),
         (URL.login, CLIENT, HTTPStatus.OK),
         (URL.logout, CLIENT, HTTPStatus.OK),
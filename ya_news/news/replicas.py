@@ -0,0 +1,114 @@
+import asyncio
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PIN_COOKIE = 'news_primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def read_from_replica():
+    """Чтение моделей news внутри блока уходит на реплики."""
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Направляет чтение моделей news на реплики из DATABASE_REPLICAS,
+    если запрос обрабатывается внутри read_from_replica().
+
+    Запись, сессии и пользователи всегда работают с основной базой:
+    реплика может отставать, и свежий вход не должен теряться.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            replica_reads.get()
+            and settings.DATABASE_REPLICAS
+            and model._meta.app_label == 'news'
+        ):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Без явного ответа Django писал бы в базу, из которой
+        # прочитан объект, то есть в реплику.
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+class ReplicaMiddleware:
+    """
+    Включает чтение из реплик для представлений с replica_reads = True:
+    у класса или, для асинхронных представлений, у самой функции.
+
+    После успешной записи браузер получает cookie, и ещё
+    REPLICA_PIN_SECONDS все его запросы читают основную базу:
+    автор сразу видит свой комментарий, даже если реплика отстала.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как MiddlewareMixin: Django вызовет __call__ как корутину.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = replica_reads.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        return self.pin_primary(request, response)
+
+    async def __acall__(self, request):
+        token = replica_reads.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        return self.pin_primary(request, response)
+
+    def pin_primary(self, request, response):
+        """После записи браузер ещё какое-то время читает основную базу."""
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in SAFE_METHODS
+            and getattr(
+                getattr(view_func, 'view_class', view_func),
+                'replica_reads',
+                False,
+            )
+            and PIN_COOKIE not in request.COOKIES
+        ):
+            replica_reads.set(True)
@@ -0,0 +1,111 @@
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count, Sum
+
+from .models import News, SearchToken
+from .moderation import ENDINGS, stem
+
+TOKEN = re.compile(r'\w+')
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = SearchToken._meta.get_field('token').max_length
+TITLE_WEIGHT = 3
+TEXT_WEIGHT = 1
+# Для поиска отбрасываются и окончания после ь и и. Фильтру
+# запрещённых слов они не нужны: его основы стали бы слишком короткими.
+SEARCH_ENDINGS = tuple(sorted(
+    (*ENDINGS, 'ия', 'ию', 'ии', 'ья', 'ью', 'ье', 'ьи'),
+    key=len,
+    reverse=True,
+))
+
+
+def tokenize(text):
+    """
+    Основы слов текста с числом вхождений.
+
+    Окончания отбрасываются, поэтому запрос находит другие словоформы.
+    """
+    return Counter(
+        stem(token, SEARCH_ENDINGS) for token in TOKEN.findall(text.lower())
+        if MIN_TOKEN_LENGTH <= len(token) <= MAX_TOKEN_LENGTH
+    )
+
+
+def news_tokens(news):
+    weights = Counter()
+    for token, count in tokenize(news.title).items():
+        weights[token] += count * TITLE_WEIGHT
+    for token, count in tokenize(news.text).items():
+        weights[token] += count * TEXT_WEIGHT
+    return [
+        SearchToken(news_id=news.pk, token=token, weight=weight)
+        for token, weight in weights.items()
+    ]
+
+
+def comment_tokens(comment):
+    return [
+        SearchToken(
+            news_id=comment.news_id,
+            comment_id=comment.pk,
+            token=token,
+            weight=count * TEXT_WEIGHT,
+        )
+        for token, count in tokenize(comment.text).items()
+    ]
+
+
+def index_news(news, created=False):
+    """Обновляет записи индекса для заголовка и текста новости."""
+    if not created:
+        SearchToken.objects.filter(
+            news_id=news.pk, comment__isnull=True
+        ).delete()
+    SearchToken.objects.bulk_create(news_tokens(news))
+
+
+def index_comment(comment, created=False):
+    """Обновляет записи индекса для одного комментария."""
+    if not settings.NEWS_SEARCH_COMMENTS:
+        return
+    if not created:
+        SearchToken.objects.filter(comment_id=comment.pk).delete()
+    SearchToken.objects.bulk_create(comment_tokens(comment))
+
+
+def index_news_list(news_list, batch_size=1000):
+    """Добавляет в индекс новости, у которых ещё нет записей."""
+    _bulk_index(map(news_tokens, news_list), batch_size)
+
+
+def index_comments(comments, batch_size=1000):
+    """Добавляет в индекс комментарии, у которых ещё нет записей."""
+    if settings.NEWS_SEARCH_COMMENTS:
+        _bulk_index(map(comment_tokens, comments), batch_size)
+
+
+def _bulk_index(token_lists, batch_size):
+    tokens = []
+    for object_tokens in token_lists:
+        tokens.extend(object_tokens)
+        if len(tokens) >= batch_size:
+            SearchToken.objects.bulk_create(tokens, batch_size=batch_size)
+            tokens = []
+    SearchToken.objects.bulk_create(tokens, batch_size=batch_size)
+
+
+def search_news(query):
+    """
+    Новости, в которых встречаются все слова запроса, с оценкой rank.
+
+    Оценка складывается из весов найденных слов: совпадение в заголовке
+    весит больше, чем в тексте новости или комментариях.
+    """
+    terms = set(tokenize(query))
+    news = News.objects.filter(tokens__token__in=terms).annotate(
+        rank=Sum('tokens__weight'),
+        matched=Count('tokens__token', distinct=True),
+    ).filter(matched=len(terms))
+    return news if terms else news.none()
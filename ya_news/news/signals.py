@@ -0,0 +1,59 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_home_page_version
+from .models import Comment, News
+from .search import index_comment, index_news
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """
+    Увеличивает счётчик комментариев новости.
+
+    Правка комментария тоже отмечается в updated_at новости.
+    """
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    News.objects.filter(pk=instance.news_id).update(**changes)
+
+
+@receiver(post_save, sender=News)
+def update_news_search_index(sender, instance, created, **kwargs):
+    """
+    Переиндексирует новость после сохранения.
+
+    При удалении новости или комментария записи индекса удаляются каскадом.
+    """
+    index_news(instance, created)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_search_index(sender, instance, created, **kwargs):
+    index_comment(instance, created)
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик комментариев новости.
+
+    При каскадном удалении самой новости запрос ничего не обновит.
+    """
+    News.objects.filter(pk=instance.news_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0),
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_home_page(sender, **kwargs):
+    """Любое изменение новостей или комментариев сбрасывает кэш ленты."""
+    bump_home_page_version()
@@ -1,12 +1,31 @@
+from django.conf import settings
 from django.urls import path
 
-from news import views
+from news import async_views, views
 
 app_name = 'news'
 
+if settings.NEWS_VIEWS_MODE == 'async':
+    home_view = async_views.news_list
+    detail_view = async_views.news_detail
+else:
+    home_view = views.NewsList.as_view()
+    detail_view = views.NewsDetailView.as_view()
+
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path('', home_view, name='home'),
+    path('search/', views.NewsSearch.as_view(), name='search'),
+    path('news/<int:pk>/', detail_view, name='detail'),
+    path(
+        'news/<int:pk>/events/',
+        views.NewsEvents.as_view(),
+        name='events'
+    ),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsComments.as_view(),
+        name='comments'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
@@ -1,27 +1,114 @@
+from urllib.parse import urlencode
+
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .cache import get_home_page, home_page_key, set_home_page
+from .events import comment_stream, publish_comment
 from .forms import CommentForm
+from .freshness import news_detail_etag, news_list_etag
 from .models import Comment, News
+from .pagination import keyset_page
+from .search import search_news
 
 
+@method_decorator(condition(etag_func=news_list_etag), name='get')
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
+    replica_reads = True
+
+    def get(self, request, *args, **kwargs):
+        """Анонимным читателям отдаём ленту из кэша."""
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        key = home_page_key(request.GET.get('after'))
+        content = get_home_page(key)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().get(request, *args, **kwargs)
+        response.add_post_render_callback(
+            lambda response: set_home_page(key, response.content)
+        )
+        return response
 
     def get_queryset(self):
         """
-        Выводим только несколько последних новостей.
+        Выводим страницу новостей, начиная с курсора ?after=.
 
-        Их количество определяется в настройках проекта.
+        Размер страницы определяется в настройках проекта, а число
+        комментариев берётся из денормализованного счётчика.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        news, self.next_cursor = keyset_page(
+            self.model.objects.all(),
+            'date',
+            self.request.GET.get('after'),
+            settings.NEWS_COUNT_ON_HOME_PAGE,
+            descending=True,
+        )
+        return news
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.next_cursor
+        return context
+
+
+def comments_page(request, news_pk):
+    """
+    Страница комментариев к новости, начиная с курсора ?comments_after=.
+
+    Возвращает контекст для шаблона news/includes/comments.html.
+    """
+    comments, cursor = keyset_page(
+        Comment.objects.filter(news_id=news_pk).select_related('author'),
+        'created',
+        request.GET.get('comments_after'),
+        settings.COMMENTS_COUNT_ON_PAGE,
+    )
+    context = {'comments': comments}
+    if cursor:
+        query = urlencode({'comments_after': cursor})
+        context['next_comments_url'] = (
+            reverse('news:detail', args=(news_pk,)) + f'?{query}#comments'
+        )
+        context['next_comments_fragment_url'] = (
+            reverse('news:comments', args=(news_pk,)) + f'?{query}'
+        )
+    return context
+
+
+class NewsSearch(generic.ListView):
+    """Поиск по новостям и комментариям с ранжированием."""
+    template_name = 'news/search.html'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '')
+        news, self.next_cursor = keyset_page(
+            search_news(self.query),
+            'rank',
+            self.request.GET.get('after'),
+            settings.NEWS_SEARCH_COUNT_ON_PAGE,
+            descending=True,
+        )
+        return news
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        if self.next_cursor:
+            context['next_url'] = '?' + urlencode(
+                {'q': self.query, 'after': self.next_cursor}
+            )
+        return context
 
 
 class NewsDetail(generic.DetailView):
@@ -29,19 +116,54 @@ class NewsDetail(generic.DetailView):
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
+        """Вместе с новостью отдаём только первую страницу комментариев."""
         context = super().get_context_data(**kwargs)
+        context.update(comments_page(self.request, self.object.pk))
         if self.request.user.is_authenticated:
             context['form'] = CommentForm()
+        if settings.NEWS_EVENTS:
+            context['events_url'] = reverse(
+                'news:events', args=(self.object.pk,)
+            )
+        return context
+
+
+class NewsComments(generic.TemplateView):
+    """Фрагмент со следующей страницей комментариев к новости."""
+    template_name = 'news/includes/comments.html'
+    replica_reads = True
+
+    def get_context_data(self, **kwargs):
+        get_object_or_404(News, pk=self.kwargs['pk'])
+        context = super().get_context_data(**kwargs)
+        context.update(comments_page(self.request, self.kwargs['pk']))
         return context
 
 
+class NewsEvents(generic.View):
+    """Новые комментарии к новости в формате server-sent events."""
+
+    def get(self, request, pk):
+        if not settings.NEWS_EVENTS:
+            raise Http404('Поток комментариев отключён.')
+        get_object_or_404(News, pk=pk)
+        try:
+            last_event_id = int(request.headers['Last-Event-ID'])
+        except (KeyError, ValueError):
+            last_event_id = None
+        response = StreamingHttpResponse(
+            comment_stream(pk, last_event_id),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Nginx не должен копить поток в буфере.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
 class NewsComment(
         LoginRequiredMixin,
         generic.detail.SingleObjectMixin,
@@ -55,11 +177,17 @@ class NewsComment(
         self.object = self.get_object()
         return super().post(request, *args, **kwargs)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(comments_page(self.request, self.object.pk))
+        return context
+
     def form_valid(self, form):
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
         comment.save()
+        transaction.on_commit(lambda: publish_comment(comment))
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -67,7 +195,9 @@ class NewsComment(
         return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
 
 
+@method_decorator(condition(etag_func=news_detail_etag), name='get')
 class NewsDetailView(generic.View):
+    replica_reads = True
 
     def get(self, request, *args, **kwargs):
         view = NewsDetail.as_view()
@@ -1,8 +1,12 @@
+import os
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общие для YaNews и YaNote модули лежат в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
 
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
@@ -17,15 +21,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'yacommon.apps.YacommonConfig',
     'news.apps.NewsConfig',
 ]
 
 MIDDLEWARE = [
+    'yacommon.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yacommon.auth.CachedAuthenticationMiddleware',
+    'news.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -51,14 +58,94 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
+DATABASE_BACKENDS = {
+    'sqlite': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('SQLITE_NAME', BASE_DIR / 'db.sqlite3'),
+    },
+    # Для PostgreSQL нужен пакет psycopg2.
+    'postgres': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('POSTGRES_DB', 'yanews'),
+        'USER': os.getenv('POSTGRES_USER', 'yanews'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', 'localhost'),
+        'PORT': os.getenv('DB_PORT', '5432'),
+    },
+}
+# Пул соединений внутри процесса: соединение возвращается в пул
+# в конце запроса, а не закрывается.
+DATABASE_BACKENDS['postgres_pool'] = {
+    **DATABASE_BACKENDS['postgres'],
+    'ENGINE': 'yacommon.backends.postgresql_pool',
+    'POOL_MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+    'POOL_MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+    # Сколько секунд ждать свободное соединение, прежде чем открыть
+    # соединение в обход пула.
+    'POOL_TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 5)),
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        **DATABASE_BACKENDS[os.getenv('DB_BACKEND', 'sqlite')],
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        # Проверять постоянное соединение перед каждым запросом.
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS') == '1',
+    },
+}
+
+# Реплика для чтения ленты и новостей. Локально её заменяет копия
+# файла SQLite: DB_REPLICA_NAME=replica.sqlite3.
+if os.getenv('DB_REPLICA_NAME') or os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.getenv('DB_REPLICA_HOST', DATABASES['default'].get('HOST')),
+        'TEST': {'MIRROR': 'default'},
     }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['news.replicas.ReplicaRouter']
+# Сколько секунд после записи читать свои данные из основной базы.
+REPLICA_PIN_SECONDS = 10
+
+# Применяются к каждому новому соединению с SQLite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
 }
 
 
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanews',
+    },
+    'filebased': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', BASE_DIR / 'cache'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'locmem')],
+}
+
+# Хранилище сессий. signed_cookies обходится без запросов к базе,
+# но выход не отзывает уже выданную cookie: её копия остаётся рабочей.
+SESSION_BACKENDS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_BACKENDS[os.getenv('SESSION_BACKEND', 'db')]
+
+# Пользователь запроса берётся из кэша, а не из базы. Требует общего
+# кэша; срок жизни ограничивает устаревание после массовых update().
+AUTH_USER_CACHE = os.getenv('AUTH_USER_CACHE') == '1'
+AUTH_USER_CACHE_TIMEOUT = 60
+
+
 AUTH_PASSWORD_VALIDATORS = []
 
 
@@ -80,3 +167,37 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+COMMENTS_COUNT_ON_PAGE = 50
+NEWS_SEARCH_COUNT_ON_PAGE = 10
+NEWS_SEARCH_COMMENTS = True
+
+NEWS_HOME_CACHE_TIMEOUT = 60 * 5
+
+# Новые комментарии для подписчиков server-sent events. Поток включается
+# явно: в WSGI каждый открытый поток занимает воркер на время до
+# NEWS_EVENTS_MAX_DURATION, а InProcessBroker доставляет события только
+# внутри одного процесса.
+NEWS_EVENTS = os.getenv('NEWS_EVENTS') == '1'
+NEWS_EVENTS_BROKER = 'news.events.InProcessBroker'
+NEWS_EVENTS_HISTORY = 100
+NEWS_EVENTS_CHANNELS = 1000
+NEWS_EVENTS_KEEPALIVE = 15
+NEWS_EVENTS_MAX_DURATION = 60 * 5
+# Пауза перед переподключением браузера, в миллисекундах.
+NEWS_EVENTS_RETRY = 3000
+
+# sync — обычные представления, async — асинхронные ленты и страницы
+# новости для запуска под ASGI.
+NEWS_VIEWS_MODE = os.getenv('NEWS_VIEWS_MODE', 'sync')
+NEWS_ASYNC_DB_THREADS = int(os.getenv('NEWS_ASYNC_DB_THREADS', 8))
+
+# Дополнительный список запрещённых слов, по одному в строке.
+BAD_WORDS_FILE = os.getenv('BAD_WORDS_FILE')
+
+# Каталог, куда процессы сбрасывают гистограммы метрик запросов.
+# Без него, в том числе в тестах, метрики не сохраняются.
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 60
+# Файлы процессов, не обновлявшиеся дольше суток, считаются
+# оставшимися от завершённых процессов и удаляются.
+METRICS_MAX_AGE = 24 * 60 * 60
@@ -0,0 +1,119 @@
+"""
+Нагрузочный прогон маршрутов YaNote через WSGI в одном процессе.
+
+Запуск из каталога ya_note:
+    python -m benchmarks.load --notes 100000 --users 100 \
+        --concurrency 1 2 4 8
+"""
+import argparse
+from io import StringIO
+
+from benchmarks.common import report, run_load, setup_django
+
+
+def seed(notes, users, batch_size):
+    """Пакетно создаёт пользователей, заметки и поисковый индекс."""
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from notes.models import Note
+
+    user_model = get_user_model()
+    user_model.objects.bulk_create(
+        user_model(username=f'user{i}') for i in range(users)
+    )
+    author_ids = list(
+        user_model.objects.order_by('id').values_list('id', flat=True)
+    )
+    for start in range(0, notes, batch_size):
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {i}',
+                text=f'Текст заметки номер {i}',
+                slug=f'note-{i}',
+                author_id=author_ids[i % users],
+            )
+            for i in range(start, min(start + batch_size, notes))
+        )
+    call_command('rebuild_notes_index', stdout=StringIO())
+    return list(user_model.objects.order_by('id'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=100_000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 2, 4, 8]
+    )
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    args = parser.parse_args()
+    if args.users < 1 or args.notes < args.users:
+        parser.error(
+            '--users должно быть не меньше 1, а --notes — не меньше '
+            '--users: у каждого пользователя должна быть заметка.'
+        )
+
+    setup_django()
+    from django.urls import reverse
+
+    users = seed(args.notes, args.users, args.batch_size)
+    # Заметка note-<k> принадлежит k-му пользователю.
+    own_slug = {user.pk: f'note-{index}' for index, user in enumerate(users)}
+
+    def read(name, query=''):
+        def scenario(session, number):
+            kwargs = {}
+            if name in ('notes:detail', 'notes:edit'):
+                kwargs['args'] = (own_slug[session.user.pk],)
+            session.get(name, reverse(name, **kwargs) + query)
+        return scenario
+
+    def logout(session, number):
+        session.get('users:logout', reverse('users:logout'))
+        session.login()
+
+    def write(session, number):
+        slug = f'load-{number}'
+        data = {'title': f'Нагрузка {number}', 'text': 'Текст', 'slug': slug}
+        session.post('notes:add POST', reverse('notes:add'), data)
+        session.post(
+            'notes:edit POST',
+            reverse('notes:edit', args=(slug,)),
+            {**data, 'text': 'Исправленный текст'},
+        )
+        session.post(
+            'notes:delete POST', reverse('notes:delete', args=(slug,))
+        )
+
+    scenarios = {
+        name: read(name)
+        for name in (
+            'notes:home', 'notes:add', 'notes:list', 'notes:export',
+            'notes:detail', 'notes:edit', 'notes:success',
+            'users:login', 'users:signup',
+        )
+    }
+    scenarios['notes:search'] = read('notes:search', '?q=заметка')
+    scenarios['users:logout'] = logout
+    scenarios['write'] = write
+    results = {
+        name: {
+            concurrency: run_load(
+                scenario, users, concurrency, args.iterations
+            )
+            for concurrency in args.concurrency
+        }
+        for name, scenario in scenarios.items()
+    }
+    report({
+        'notes': args.notes,
+        'users': args.users,
+        'iterations': args.iterations,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
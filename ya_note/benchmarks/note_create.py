@@ -0,0 +1,72 @@
+"""
+Микробенчмарк создания заметки и кэша транслитерации slug.
+
+Запуск из каталога ya_note:
+    python -m benchmarks.note_create --notes 2000 --titles 50
+"""
+import argparse
+import random
+
+from benchmarks.common import measure, report, setup_django, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=2_000)
+    parser.add_argument(
+        '--titles', type=int, default=50, help='число разных заголовков'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from pytils.translit import slugify
+
+    from notes.forms import NoteForm
+    from notes.slugs import build_slug, slug_cache_stats
+
+    rng = random.Random(0)
+    pool = [f'Название заметки номер {i}' for i in range(args.titles)]
+    titles = [rng.choice(pool) for _ in range(args.notes)]
+
+    def transliterate_uncached():
+        for title in titles:
+            slugify(title)[:100]
+
+    def transliterate_cached():
+        for title in titles:
+            build_slug(title, 100)
+
+    author = get_user_model().objects.create(username='bench')
+
+    def create_notes():
+        for title in titles:
+            form = NoteForm(data={'title': title, 'text': 'Текст'})
+            form.is_valid()
+            note = form.save(commit=False)
+            note.author = author
+            note.save()
+
+    build_slug.cache_clear()
+    per_note = 1000 / args.notes
+    report({
+        'notes': args.notes,
+        'distinct_titles': args.titles,
+        'slugify_us_per_note': summary([
+            ms * per_note
+            for ms in measure(transliterate_uncached, args.repeat)
+        ]),
+        'build_slug_us_per_note': summary([
+            ms * per_note
+            for ms in measure(transliterate_cached, args.repeat)
+        ]),
+        'form_create_us_per_note': summary([
+            ms * per_note for ms in measure(create_notes, 1)
+        ]),
+        'slug_cache': slug_cache_stats(),
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Импорт заметок: по одной через NoteForm против пакетного import_notes.
+
+Запуск из каталога ya_note:
+    python -m benchmarks.note_import --notes 5000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import report, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=5_000)
+    parser.add_argument(
+        '--titles', type=int, default=100, help='число разных заголовков'
+    )
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+
+    from notes.forms import NoteForm
+    from notes.importer import import_notes
+
+    rng = random.Random(0)
+    records = [
+        {'title': f'Заметка {rng.randrange(args.titles)}', 'text': 'Текст'}
+        for _ in range(args.notes)
+    ]
+    user_model = get_user_model()
+
+    form_author = user_model.objects.create(username='form')
+    started = time.perf_counter()
+    for record in records:
+        form = NoteForm(data=record)
+        if form.is_valid():
+            note = form.save(commit=False)
+            note.author = form_author
+            note.save()
+    form_elapsed = time.perf_counter() - started
+
+    bulk_author = user_model.objects.create(username='bulk')
+    started = time.perf_counter()
+    import_notes(bulk_author, records, args.batch_size)
+    bulk_elapsed = time.perf_counter() - started
+
+    report({
+        'notes': args.notes,
+        'distinct_titles': args.titles,
+        'form_rows_per_sec': round(args.notes / form_elapsed),
+        'bulk_rows_per_sec': round(args.notes / bulk_elapsed),
+        'speedup': round(form_elapsed / bulk_elapsed, 1),
+    })
+
+
+if __name__ == '__main__':
+    main()
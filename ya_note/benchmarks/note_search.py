@@ -0,0 +1,87 @@
+"""
+Задержка поиска по заметкам: индекс слов против icontains.
+
+Запуск из каталога ya_note:
+    python -m benchmarks.note_search --notes 1000000
+"""
+import argparse
+import random
+
+from benchmarks.common import measure, report, setup_django, summary
+
+WORDS_PER_NOTE = 12
+VOCABULARY_SIZE = 50_000
+
+
+def seed(notes, authors, batch_size, rng):
+    """Создаёт пользователей и заметки со случайными словами и индекс."""
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+    from notes.search import index_notes
+
+    user_model = get_user_model()
+    user_model.objects.bulk_create(
+        user_model(username=f'user{i}') for i in range(authors)
+    )
+    author_ids = list(user_model.objects.values_list('id', flat=True))
+    vocabulary = [f'слово{i}' for i in range(VOCABULARY_SIZE)]
+    for start in range(0, notes, batch_size):
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {i}',
+                text=' '.join(rng.choices(vocabulary, k=WORDS_PER_NOTE)),
+                slug=f'note-{i}',
+                author_id=rng.choice(author_ids),
+            )
+            for i in range(start, min(start + batch_size, notes))
+        )
+    index_notes(Note.objects.iterator(chunk_size=batch_size), batch_size)
+    return author_ids, vocabulary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=1_000_000)
+    parser.add_argument('--authors', type=int, default=1_000)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from notes.models import Note
+    from notes.search import search_notes
+
+    rng = random.Random(0)
+    author_ids, vocabulary = seed(
+        args.notes, args.authors, args.batch_size, rng
+    )
+
+    def indexed():
+        author_id = rng.choice(author_ids)
+        list(search_notes(author_id, rng.choice(vocabulary)).values('id'))
+
+    def scan():
+        list(Note.objects.filter(
+            author_id=rng.choice(author_ids),
+            text__icontains=rng.choice(vocabulary),
+        ).values('id'))
+
+    def scan_all_authors():
+        list(Note.objects.filter(
+            text__icontains=rng.choice(vocabulary)
+        ).values('id')[:10])
+
+    report({
+        'notes': args.notes,
+        'authors': args.authors,
+        'index_ms': summary(measure(indexed, args.repeat)),
+        'icontains_per_author_ms': summary(measure(scan, args.repeat)),
+        'icontains_table_scan_ms': summary(
+            measure(scan_all_authors, min(args.repeat, 5))
+        ),
+    })
+
+
+if __name__ == '__main__':
+    main()
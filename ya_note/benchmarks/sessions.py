@@ -0,0 +1,61 @@
+"""
+Стоимость сессии и загрузки пользователя на маршруте notes:list.
+
+Для каждого хранилища сессий прогон повторяется с AUTH_USER_CACHE
+и без него. Запуск из каталога ya_note:
+    python -m benchmarks.sessions --notes 10000 --users 100 \
+        --concurrency 1 4
+"""
+import argparse
+
+from benchmarks.common import report, run_load, setup_django
+from benchmarks.load import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=10_000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 4]
+    )
+    parser.add_argument('--iterations', type=int, default=400)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.test import override_settings
+    from django.urls import reverse
+
+    users = seed(args.notes, args.users, args.batch_size)
+    url = reverse('notes:list')
+
+    def scenario(session, number):
+        session.get('notes:list', url)
+
+    results = {}
+    for backend, engine in settings.SESSION_BACKENDS.items():
+        for user_cache in (False, True):
+            mode = f'{backend}+user_cache' if user_cache else backend
+            with override_settings(
+                SESSION_ENGINE=engine, AUTH_USER_CACHE=user_cache
+            ):
+                cache.clear()
+                results[mode] = {
+                    concurrency: run_load(
+                        scenario, users, concurrency, args.iterations
+                    )['notes:list']
+                    for concurrency in args.concurrency
+                }
+    report({
+        'notes': args.notes,
+        'users': args.users,
+        'iterations': args.iterations,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
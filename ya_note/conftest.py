@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import cache
+
+from yacommon.testing import (  # noqa: F401
+    django_db_setup,
+    fast_password_hasher,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш заметок не переживает откат базы, очищаем его."""
+    cache.clear()
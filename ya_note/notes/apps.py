@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from yacommon.cache import require_shared_cache
+
+        from . import signals  # noqa: F401
+
+        require_shared_cache('NOTE_CACHE')
@@ -0,0 +1,121 @@
+"""
+Кэш заметок по паре (автор, slug).
+
+Страницы заметки, её редактирования и удаления ищут одну и ту же запись;
+с NOTE_CACHE заметка читается из кэша, а промах загружает её из базы.
+Записи сбрасываются сигналами при сохранении и удалении заметки, а после
+пакетного импорта — через invalidate_notes. Массовые update() и delete()
+сигналов не посылают — после них кэш нужно очищать самостоятельно.
+Кэш должен быть общим для процессов, это проверяется при запуске.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from yacommon.cache import incr_counter
+
+from .models import Note
+
+NOTE_KEY = 'notes:note:{author_id}:{slug}'
+LOCK_KEY = 'notes:note-lock:{author_id}:{slug}'
+STATS_KEYS = {
+    'hits': 'notes:note-cache:hits',
+    'misses': 'notes:note-cache:misses',
+    'lock_waits': 'notes:note-cache:lock-waits',
+    'lock_timeouts': 'notes:note-cache:lock-timeouts',
+}
+# Отсутствующая заметка тоже кэшируется, чтобы 404 не ходили в базу.
+MISSING = 'missing'
+
+
+def note_key(author_id, slug):
+    return NOTE_KEY.format(author_id=author_id, slug=slug)
+
+
+def get_note(author_id, slug):
+    """Заметка автора по slug или None, если такой нет."""
+    key = note_key(author_id, slug)
+    note = cache.get(key)
+    if note is None:
+        _count('misses')
+        note = _load(author_id, slug)
+    else:
+        _count('hits')
+    return None if note == MISSING else note
+
+
+def invalidate_note(author_id, slug):
+    cache.delete(note_key(author_id, slug))
+
+
+def invalidate_notes(notes):
+    """Сбрасывает записи пакета, в том числе закэшированные 404."""
+    cache.delete_many([note_key(note.author_id, note.slug) for note in notes])
+
+
+def _load(author_id, slug):
+    """
+    Загружает заметку из базы и кладёт её в кэш.
+
+    С NOTE_CACHE_LOCK промах по популярной заметке загружает её один раз:
+    остальные запросы ждут, пока владелец блокировки заполнит кэш,
+    и идут в базу сами, только если не дождались.
+    """
+    key = note_key(author_id, slug)
+    lock = LOCK_KEY.format(author_id=author_id, slug=slug)
+    if not settings.NOTE_CACHE_LOCK or cache.add(
+        lock, 1, settings.NOTE_CACHE_LOCK_TIMEOUT
+    ):
+        try:
+            return _fetch(key, author_id, slug)
+        finally:
+            if settings.NOTE_CACHE_LOCK:
+                cache.delete(lock)
+    _count('lock_waits')
+    deadline = time.monotonic() + settings.NOTE_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(settings.NOTE_CACHE_LOCK_POLL)
+        note = cache.get(key)
+        if note is not None:
+            return note
+    _count('lock_timeouts')
+    return _fetch(key, author_id, slug)
+
+
+def _fetch(key, author_id, slug):
+    note = Note.objects.filter(author_id=author_id, slug=slug).first()
+    if note is None:
+        note = MISSING
+    cache.set(key, note, settings.NOTE_CACHE_TIMEOUT)
+    return note
+
+
+def _count(name):
+    incr_counter(STATS_KEYS[name])
+
+
+def note_cache_stats(reset=False):
+    """Счётчики кэша заметок."""
+    stats = {
+        name: cache.get(key, 0) for name, key in STATS_KEYS.items()
+    }
+    if reset:
+        cache.delete_many(STATS_KEYS.values())
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / total if total else 0.0
+    return stats
+
+
+def get_request_note(request, slug):
+    """
+    Заметка текущего пользователя; запоминается на время запроса.
+
+    Без NOTE_CACHE заметка читается из базы, но тоже один раз на запрос.
+    """
+    if not hasattr(request, 'cached_note'):
+        request.cached_note = (
+            get_note(request.user.pk, slug) if settings.NOTE_CACHE
+            else Note.objects.filter(author=request.user, slug=slug).first()
+        )
+    return request.cached_note
@@ -0,0 +1,90 @@
+import csv
+import json
+import zipfile
+from datetime import datetime
+
+CSV_FIELDS = ('id', 'slug', 'title', 'text')
+# Сколько символов заметки записывается в архив за один раз.
+ZIP_WRITE_SIZE = 64 * 1024
+
+
+class StreamBuffer:
+    """Файлоподобный приёмник, отдающий накопленные байты по частям."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class Echo:
+    """Приёмник для csv.writer, возвращающий строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def export_ndjson(notes):
+    for note in notes:
+        yield json.dumps(
+            {field: getattr(note, field) for field in CSV_FIELDS},
+            ensure_ascii=False,
+        ) + '\n'
+
+
+def export_csv(notes):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_FIELDS)
+    for note in notes:
+        yield writer.writerow(
+            [getattr(note, field) for field in CSV_FIELDS]
+        )
+
+
+def export_zip(notes):
+    """
+    Zip-архив с заметкой в markdown на каждый файл.
+
+    Архив пишется в поток без перемотки: запись архива заполняется
+    через ZipFile.open по ZIP_WRITE_SIZE символов, и сжатые байты
+    отдаются после каждой части. В памяти держится текущая заметка,
+    одна сжатая часть и оглавление архива, которое формат zip требует
+    записать в конце, — около килобайта на заметку.
+    """
+    buffer = StreamBuffer()
+    date_time = datetime.now().timetuple()[:6]
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for note in notes:
+            info = zipfile.ZipInfo(f'{note.slug}.md', date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, 'w') as file:
+                for chunk in note_markdown(note):
+                    file.write(chunk.encode())
+                    yield buffer.pop()
+            yield buffer.pop()
+    yield buffer.pop()
+
+
+def note_markdown(note):
+    """Текст заметки в markdown частями не длиннее ZIP_WRITE_SIZE."""
+    yield f'# {note.title}\n\n'
+    for start in range(0, len(note.text), ZIP_WRITE_SIZE):
+        yield note.text[start:start + ZIP_WRITE_SIZE]
+    yield '\n'
+
+
+EXPORTERS = {
+    'ndjson': (export_ndjson, 'application/x-ndjson'),
+    'csv': (export_csv, 'text/csv'),
+    'zip': (export_zip, 'application/zip'),
+}
@@ -0,0 +1,42 @@
+"""
+ETag и Last-Modified для условных GET-запросов к заметкам.
+
+Список проверяется одним запросом по индексу (author, updated_at),
+а заметка берётся из кэша, который затем использует и само представление.
+"""
+from django.db.models import Count, Max
+
+from yacommon.cache import make_etag
+
+from .cache import get_request_note
+from .models import Note
+
+
+def notes_list_etag(request, *args, **kwargs):
+    """
+    Число заметок автора и время последней правки.
+
+    Удаление меняет число заметок, поэтому Last-Modified для списка
+    не отдаём: дата последней правки после удаления не меняется.
+    """
+    freshness = Note.objects.filter(author=request.user).aggregate(
+        count=Count('id'), updated_at=Max('updated_at')
+    )
+    return make_etag(
+        request.user.pk,
+        freshness['count'],
+        freshness['updated_at'],
+        request.GET.urlencode(),
+    )
+
+
+def note_updated_at(request, slug, *args, **kwargs):
+    note = get_request_note(request, slug)
+    return note and note.updated_at
+
+
+def note_etag(request, slug, *args, **kwargs):
+    updated_at = note_updated_at(request, slug)
+    if updated_at is None:
+        return None
+    return make_etag(request.user.pk, slug, updated_at.isoformat())
@@ -0,0 +1,112 @@
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .cache import invalidate_notes
+from .forms import WARNING
+from .models import Note
+from .search import index_notes
+from .slugs import MAX_ATTEMPTS, allocate_slugs, build_slug
+
+IMPORT_FIELDS = ('title', 'text', 'slug')
+
+
+def build_note(record, author):
+    """Создаёт заметку из записи и проверяет значения полей."""
+    if not isinstance(record, dict):
+        raise ValidationError('Запись должна быть JSON-объектом.')
+    unknown = set(record) - set(IMPORT_FIELDS)
+    if unknown:
+        raise ValidationError(f'Неизвестные поля: {", ".join(unknown)}.')
+    note = Note(author=author, **record)
+    note.clean_fields()
+    note.generated_slug = not note.slug
+    return note
+
+
+def save_batch(batch):
+    """
+    Сохраняет пакет заметок одной вставкой.
+
+    Явно заданный slug, который уже занят или повторяется в пакете,
+    отклоняется, как и в NoteForm. Суффиксы подбираются только для slug,
+    построенных по заголовку, — сразу для всего пакета одним запросом.
+    Если параллельная вставка заняла один из них, пакет пересчитывается.
+    Сигналы не отправляются, поэтому индекс и кэш заметок обновляются
+    здесь же. Возвращает сохранённые заметки и пары (заметка, ошибка)
+    для отклонённых.
+    """
+    max_length = Note._meta.get_field('slug').max_length
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        notes, rejected = split_explicit(batch)
+        generated = [note for note in notes if note.generated_slug]
+        bases = [
+            build_slug(note.title, max_length) or 'note' for note in generated
+        ]
+        explicit = {note.slug for note in notes if not note.generated_slug}
+        for note, slug in zip(generated, allocate_slugs(
+            Note, bases, max_length, reserved=explicit
+        )):
+            note.slug = slug
+        try:
+            with transaction.atomic():
+                Note.objects.bulk_create(notes)
+                index_notes(Note.objects.filter(
+                    slug__in=[note.slug for note in notes]
+                ).only('id', 'author', 'title', 'text'))
+                # Под этими slug в кэше могли остаться ответы 404.
+                transaction.on_commit(lambda: invalidate_notes(notes))
+            invalidate_notes(notes)
+            return notes, rejected
+        except IntegrityError:
+            if attempt == MAX_ATTEMPTS:
+                raise
+
+
+def split_explicit(notes):
+    """Отделяет заметки, чей явно заданный slug занят или повторяется."""
+    explicit = [note.slug for note in notes if not note.generated_slug]
+    taken = set(Note.objects.filter(slug__in=explicit).values_list(
+        'slug', flat=True
+    ))
+    accepted, rejected = [], []
+    for note in notes:
+        if note.generated_slug:
+            accepted.append(note)
+        elif note.slug in taken:
+            rejected.append((note, ValidationError(note.slug + WARNING)))
+        else:
+            taken.add(note.slug)
+            accepted.append(note)
+    return accepted, rejected
+
+
+def import_notes(author, records, batch_size=500):
+    """
+    Импортирует заметки автора пакетами.
+
+    Возвращает число созданных заметок и список ошибок по записям.
+    """
+    created, errors = 0, []
+    notes = (
+        _build_or_report(number, record, author, errors)
+        for number, record in enumerate(records, 1)
+    )
+    notes = (note for note in notes if note is not None)
+    while batch := list(islice(notes, batch_size)):
+        saved, rejected = save_batch(batch)
+        created += len(saved)
+        errors += [(note.import_number, error) for note, error in rejected]
+    errors.sort(key=lambda item: item[0])
+    return created, errors
+
+
+def _build_or_report(number, record, author, errors):
+    try:
+        note = build_note(record, author)
+    except (ValidationError, TypeError) as error:
+        errors.append((number, error))
+        return None
+    note.import_number = number
+    return note
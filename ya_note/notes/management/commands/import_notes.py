@@ -0,0 +1,55 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.importer import import_notes
+
+MAX_REPORTED_ERRORS = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует заметки пользователя из NDJSON или JSON-массива '
+        'пакетной вставкой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Автор импортируемых заметок.')
+        parser.add_argument(
+            'path',
+            help='Файл .ndjson/.jsonl с объектом на строку или .json-массив.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Число заметок в одной вставке.',
+        )
+
+    def handle(self, *args, **options):
+        user_model = get_user_model()
+        try:
+            author = user_model.objects.get(username=options['username'])
+        except user_model.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        started = time.perf_counter()
+        with open(options['path'], encoding='utf-8') as file:
+            if options['path'].endswith(('.ndjson', '.jsonl')):
+                records = (json.loads(line) for line in file if line.strip())
+            else:
+                records = json.load(file)
+            created, errors = import_notes(
+                author, records, options['batch_size']
+            )
+        elapsed = time.perf_counter() - started
+        for number, error in errors[:MAX_REPORTED_ERRORS]:
+            self.stderr.write(f'Запись {number}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано заметок: {created}, пропущено с ошибками: '
+            f'{len(errors)}, записей в секунду: '
+            f'{(created + len(errors)) / elapsed:.0f}.'
+        ))
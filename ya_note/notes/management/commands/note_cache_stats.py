@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from notes.cache import note_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        stats = note_cache_stats(reset=options['reset'])
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {stats["hit_rate"]:.1%}, '
+            f'ожиданий блокировки: {stats["lock_waits"]}, '
+            f'не дождались: {stats["lock_timeouts"]}'
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.models import Note, NoteToken
+from notes.search import index_notes
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пакета при чтении заметок и записи индекса.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            NoteToken.objects.all().delete()
+            index_notes(
+                Note.objects.only('id', 'author', 'title', 'text').iterator(
+                    chunk_size=batch_size
+                ),
+                batch_size=batch_size,
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в индексе: {NoteToken.objects.count()}'
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.15 on 2026-10-17 04:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=50)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='notes.note')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notetoken',
+            index=models.Index(fields=['author', 'token', 'note'], name='note_token_author_idx'),
+        ),
+    ]
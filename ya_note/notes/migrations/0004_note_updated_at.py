@@ -0,0 +1,22 @@
+# Generated by Django 3.2.15 on 2026-10-17 05:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_notetoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'updated_at'], name='note_author_updated_idx'),
+        ),
+    ]
@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.db import models
 
-from pytils.translit import slugify
+from .slugs import save_with_unique_slug
 
 
 class Note(models.Model):
@@ -27,12 +27,53 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+            models.Index(
+                fields=('author', 'updated_at'),
+                name='note_author_updated_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминаем загруженный slug, чтобы при смене сбросить кэш."""
+        note = super().from_db(db, field_names, values)
+        note.loaded_slug = note.__dict__.get('slug')
+        return note
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        return save_with_unique_slug(self, super().save, *args, **kwargs)
+
+
+class NoteToken(models.Model):
+    """Слово из заметки в поисковом индексе."""
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='tokens',
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    token = models.CharField(max_length=50)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'token', 'note'),
+                name='note_token_author_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.token
@@ -0,0 +1,58 @@
+import re
+
+from .models import Note, NoteToken
+
+TOKEN = re.compile(r'\w+')
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = NoteToken._meta.get_field('token').max_length
+
+
+def tokenize(text):
+    """Множество слов текста в нижнем регистре."""
+    return {
+        token for token in TOKEN.findall(text.lower())
+        if MIN_TOKEN_LENGTH <= len(token) <= MAX_TOKEN_LENGTH
+    }
+
+
+def note_tokens(note):
+    return [
+        NoteToken(note_id=note.pk, author_id=note.author_id, token=token)
+        for token in tokenize(f'{note.title} {note.text}')
+    ]
+
+
+def index_note(note, created=False):
+    """Обновляет записи индекса одной заметки."""
+    if not created:
+        NoteToken.objects.filter(note_id=note.pk).delete()
+    NoteToken.objects.bulk_create(note_tokens(note))
+
+
+def index_notes(notes, batch_size=1000):
+    """Добавляет в индекс заметки, у которых ещё нет записей."""
+    tokens = []
+    for note in notes:
+        tokens.extend(note_tokens(note))
+        if len(tokens) >= batch_size:
+            NoteToken.objects.bulk_create(tokens, batch_size=batch_size)
+            tokens = []
+    NoteToken.objects.bulk_create(tokens, batch_size=batch_size)
+
+
+def search_notes(author, query):
+    """
+    Заметки автора, содержащие все слова запроса.
+
+    Каждое слово ищется по индексу (author, token), поэтому время
+    поиска не зависит от общего числа заметок.
+    """
+    terms = tokenize(query)
+    notes = Note.objects.filter(author=author)
+    if not terms:
+        return notes.none()
+    for term in terms:
+        notes = notes.filter(pk__in=NoteToken.objects.filter(
+            author=author, token=term
+        ).values('note'))
+    return notes
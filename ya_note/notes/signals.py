@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_note
+from .models import Note
+from .search import index_note
+
+
+@receiver(post_save, sender=Note)
+def update_search_index(sender, instance, created, **kwargs):
+    """
+    Переиндексирует заметку после сохранения.
+
+    При удалении записи индекса удаляются каскадом.
+    """
+    index_note(instance, created)
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_note_cache(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш заметки под текущим и прежним slug.
+
+    Запись удаляется сразу и ещё раз после фиксации транзакции: иначе
+    параллельный запрос успел бы вернуть в кэш старую версию из базы.
+    """
+    slugs = {instance.slug, getattr(instance, 'loaded_slug', None)} - {None}
+    author_id = instance.author_id
+
+    def invalidate():
+        for slug in slugs:
+            invalidate_note(author_id, slug)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+    instance.loaded_slug = instance.slug
@@ -0,0 +1,157 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from pytils.translit import slugify
+
+MAX_ATTEMPTS = 5
+SUFFIX = re.compile(r'^(?P<base>.*)-(?P<number>[0-9]+)$')
+# Запас под суффикс вида -NNNNNNNNN при обрезке длинных slug.
+SUFFIX_RESERVE = 10
+# Больше любого символа slug: верхняя граница диапазона по префиксу.
+MAX_CHAR = '\U0010ffff'
+# SQLite ограничивает глубину выражения, поэтому условия по основам
+# пакета разбиваются на несколько запросов.
+BASES_PER_QUERY = 200
+
+
+@lru_cache(maxsize=settings.SLUG_CACHE_SIZE)
+def build_slug(title, max_length):
+    """
+    Slug по заголовку заметки.
+
+    Заголовки часто повторяются, поэтому результат транслитерации
+    запоминается в ограниченном LRU-кэше.
+    """
+    return slugify(title)[:max_length]
+
+
+def slug_cache_stats():
+    """Статистика кэша транслитерации."""
+    info = build_slug.cache_info()
+    total = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+        'hit_rate': info.hits / total if total else 0.0,
+    }
+
+
+def with_suffix(base, number, max_length):
+    """Добавляет к slug суффикс -N, обрезая основу под max_length."""
+    if number == 1:
+        return base
+    suffix = f'-{number}'
+    return base[:max_length - len(suffix)] + suffix
+
+
+def slug_prefix(base, max_length):
+    return base[:max(max_length - SUFFIX_RESERVE, 1)]
+
+
+def prefix_range(prefix):
+    """
+    Условие «slug начинается с prefix» в виде диапазона.
+
+    LIKE в SQLite не учитывает регистр и не использует уникальный
+    индекс по slug, а диапазон читается по индексу.
+    """
+    return Q(slug__gte=prefix, slug__lt=prefix + MAX_CHAR)
+
+
+def variants_query(base, max_length):
+    """
+    Условие на slug вида base и base-<цифры>.
+
+    Чужие slug, которые только начинаются с base, например base-zhizn,
+    в диапазон base-0...base-9 не попадают. Если основу приходится
+    обрезать под суффикс, берётся диапазон по обрезанному префиксу.
+    """
+    prefix = slug_prefix(base, max_length)
+    if prefix != base:
+        return prefix_range(prefix)
+    return Q(slug=base) | Q(
+        slug__gte=f'{base}-0', slug__lt=f'{base}-9{MAX_CHAR}'
+    )
+
+
+def taken_numbers(model, base, max_length):
+    """
+    Номера занятых вариантов base, base-2, base-3...
+
+    Все варианты выбираются одним запросом по индексу, slug с другим
+    продолжением после base отбрасываются.
+    """
+    numbers = set()
+    for slug in model.objects.filter(
+        variants_query(base, max_length)
+    ).values_list('slug', flat=True):
+        match = SUFFIX.match(slug)
+        if slug == base:
+            numbers.add(1)
+        elif match and with_suffix(
+            base, int(match['number']), max_length
+        ) == slug:
+            numbers.add(int(match['number']))
+    return numbers
+
+
+def save_with_unique_slug(instance, save, *args, **kwargs):
+    """
+    Сохраняет объект, подбирая уникальный slug по заголовку.
+
+    Сначала выполняется обычная вставка: уникальность проверяет
+    ограничение в базе. Только при конфликте одним запросом ищутся
+    занятые суффиксы, и вставка повторяется со следующим номером.
+    Так не бывает гонки между проверкой и вставкой.
+    """
+    model = type(instance)
+    max_length = model._meta.get_field('slug').max_length
+    base = build_slug(instance.title, max_length) or 'note'
+    number = 1
+    for _ in range(MAX_ATTEMPTS):
+        instance.slug = with_suffix(base, number, max_length)
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            taken = taken_numbers(model, base, max_length)
+            # Конфликт не по slug: вариант с таким номером свободен.
+            if number not in taken:
+                raise
+            number = max(taken) + 1
+    raise IntegrityError(f'Не удалось подобрать уникальный slug для {base}.')
+
+
+def allocate_slugs(model, bases, max_length, reserved=()):
+    """
+    Уникальные slug для пакета основ.
+
+    Занятые варианты выбираются запросами по BASES_PER_QUERY основ,
+    дальнейший подбор суффиксов идёт в памяти. Slug из reserved тоже
+    считаются занятыми.
+    """
+    unique = sorted(set(bases))
+    taken = set(reserved)
+    for start in range(0, len(unique), BASES_PER_QUERY):
+        query = Q()
+        for base in unique[start:start + BASES_PER_QUERY]:
+            query |= variants_query(base, max_length)
+        taken.update(
+            model.objects.filter(query).values_list('slug', flat=True)
+        )
+    next_numbers = {}
+    slugs = []
+    for base in bases:
+        number = next_numbers.get(base, 1)
+        while with_suffix(base, number, max_length) in taken:
+            number += 1
+        slug = with_suffix(base, number, max_length)
+        taken.add(slug)
+        next_numbers[base] = number + 1
+        slugs.append(slug)
+    return slugs
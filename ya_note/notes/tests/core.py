@@ -1,7 +1,13 @@
+import json
 from collections import namedtuple
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from notes.models import Note
@@ -14,6 +20,7 @@ ANON = 'anonymous'
 FIELD_NAMES = ('title', 'text', 'slug', 'author')
 FIELD_DATA = ('Заголовок', 'Текст заметки', SLUG)
 FIELD_NEW_DATA = ('Новый заголовок', 'Новый текст', 'new-slug')
+QUERY_BUDGETS = Path(__file__).parent / 'query_budgets.json'
 
 URL_NAME = namedtuple(
     'NAME',
@@ -21,6 +28,8 @@ URL_NAME = namedtuple(
         'home',
         'add',
         'list',
+        'search',
+        'export',
         'detail',
         'edit',
         'delete',
@@ -35,6 +44,8 @@ URL = URL_NAME(
     reverse('notes:home'),
     reverse('notes:add'),
     reverse('notes:list'),
+    reverse('notes:search'),
+    reverse('notes:export'),
     reverse('notes:detail', args=(SLUG,)),
     reverse('notes:edit', args=(SLUG,)),
     reverse('notes:delete', args=(SLUG,)),
@@ -46,6 +57,9 @@ URL = URL_NAME(
 
 
 class CoreTestCase(TestCase):
+    # Тестам доступны все базы из DATABASES, включая реплики.
+    databases = '__all__'
+
     @classmethod
     def setUpTestData(cls):
         cls.author = USER_MODEL.objects.create(username=AUTHOR)
@@ -57,3 +71,51 @@ class CoreTestCase(TestCase):
         cls.note = Note.objects.create(
             **dict(zip(FIELD_NAMES, (*FIELD_DATA, cls.author)))
         )
+
+
+@contextmanager
+def capture_queries():
+    """Перехватывает запросы ко всем базам из DATABASES, включая реплики."""
+    # В тестах зеркало и его база делят одно соединение.
+    unique = {
+        id(connections[alias]): connections[alias] for alias in connections
+    }
+    with ExitStack() as stack:
+        yield [
+            stack.enter_context(CaptureQueriesContext(connection))
+            for connection in unique.values()
+        ]
+
+
+class QueryCountMixin:
+    """Проверка того, что число запросов не растёт с объёмом данных."""
+
+    query_budgets = json.loads(QUERY_BUDGETS.read_text())
+
+    def count_queries(self, client, url, seed, sizes, user=None):
+        """Наполняет базу по объёмам sizes и считает запросы страницы."""
+        counts = []
+        for size in sizes:
+            seed(size)
+            cache.clear()
+            if user is not None:
+                # Страница выхода разлогинивает клиента, входим заново.
+                client.force_login(user)
+            with capture_queries() as contexts:
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            counts.append(sum(len(context) for context in contexts))
+        return counts
+
+    def assertQueriesFlat(self, name, counts):
+        self.assertEqual(
+            len(set(counts)), 1,
+            msg=f'Число запросов для {name} растёт с объёмом данных: '
+                f'{counts}.',
+        )
+        self.assertLessEqual(
+            counts[0], self.query_budgets[name],
+            msg=f'Страница {name} выполняет {counts[0]} запросов, '
+                f'бюджет — {self.query_budgets[name]}.',
+        )
@@ -1,4 +1,16 @@
+import csv
+import json
+import random
+import string
+import zipfile
+from http import HTTPStatus
+from io import BytesIO, StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
 from notes.forms import NoteForm
+from notes.models import Note, NoteToken
 from notes.tests.core import URL, CoreTestCase
 
 
@@ -20,6 +32,23 @@ class TestNoteList(CoreTestCase):
                     ),
                 )
 
+    @override_settings(NOTES_COUNT_ON_PAGE=2)
+    def test_notes_list_pagination(self):
+        """Проверка постраничного списка заметок без текста."""
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {i}', slug=f'note-{i}', author=self.author)
+            for i in range(2)
+        )
+        context = self.author_client.get(URL.list).context
+        object_list = context['object_list']
+        self.assertEqual(len(object_list), 2)
+        self.assertEqual(context['paginator'].num_pages, 2)
+        self.assertIn(
+            'text',
+            object_list[0].get_deferred_fields(),
+            msg='Текст заметок не нужен для списка, его не стоит загружать.',
+        )
+
     def test_pages_contains_form(self):
         """Проверка формы."""
         for url in (URL.add, URL.edit):
@@ -32,3 +61,109 @@ class TestNoteList(CoreTestCase):
                         f'страницу {url}.'
                     ),
                 )
+
+
+class TestNoteSearch(CoreTestCase):
+    def search(self, client, query):
+        response = client.get(URL.search, {'q': query})
+        return list(response.context['object_list'])
+
+    def test_search_scoped_by_author(self):
+        """Поиск находит только заметки самого пользователя."""
+        for client, expected in (
+            (self.author_client, [self.note]),
+            (self.user_client, []),
+        ):
+            with self.subTest(client=client):
+                self.assertEqual(
+                    self.search(client, 'ТЕКСТ заметки'), expected
+                )
+
+    def test_search_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении заметки."""
+        self.note.text = 'Другое содержание'
+        self.note.save()
+        self.assertEqual(self.search(self.author_client, 'текст'), [])
+        self.assertEqual(
+            self.search(self.author_client, 'содержание'), [self.note]
+        )
+        self.note.delete()
+        self.assertFalse(NoteToken.objects.exists())
+
+    def test_rebuild_index(self):
+        """Проверка команды перестроения индекса."""
+        NoteToken.objects.all().delete()
+        call_command('rebuild_notes_index', stdout=StringIO())
+        self.assertEqual(
+            self.search(self.author_client, 'заголовок'), [self.note]
+        )
+
+
+class TestNoteExport(CoreTestCase):
+    def export(self, client, export_format):
+        response = client.get(URL.export, {'format': export_format})
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_export_formats(self):
+        """Выгрузка содержит заметки автора в каждом формате."""
+        ndjson = self.export(self.author_client, 'ndjson').decode()
+        self.assertEqual(json.loads(ndjson)['slug'], self.note.slug)
+        rows = list(csv.DictReader(
+            StringIO(self.export(self.author_client, 'csv').decode())
+        ))
+        self.assertEqual(rows[0]['text'], self.note.text)
+        with zipfile.ZipFile(
+            BytesIO(self.export(self.author_client, 'zip'))
+        ) as archive:
+            self.assertEqual(archive.namelist(), [f'{self.note.slug}.md'])
+            self.assertIn(
+                self.note.text,
+                archive.read(f'{self.note.slug}.md').decode(),
+            )
+
+    def test_export_zip_in_chunks(self):
+        """Длинная заметка сжимается и отдаётся по частям."""
+        letters = random.Random(0).choices(string.ascii_letters, k=300_000)
+        Note.objects.filter(pk=self.note.pk).update(text=''.join(letters))
+        response = self.author_client.get(URL.export, {'format': 'zip'})
+        chunks = [chunk for chunk in response.streaming_content if chunk]
+        self.assertGreater(len(chunks), 3)
+        with zipfile.ZipFile(BytesIO(b''.join(chunks))) as archive:
+            self.assertEqual(
+                archive.read(f'{self.note.slug}.md').decode(),
+                f'# {self.note.title}\n\n{"".join(letters)}\n',
+            )
+
+    def test_export_scoped_by_author(self):
+        """Чужие заметки не попадают в выгрузку."""
+        self.assertEqual(self.export(self.user_client, 'ndjson'), b'')
+
+
+class TestConditionalGet(CoreTestCase):
+    def test_not_modified_until_note_changes(self):
+        """Неизменившаяся страница отдаётся ответом 304."""
+        for url in (URL.list, URL.detail):
+            with self.subTest(url=url):
+                etag = self.author_client.get(url)['ETag']
+                self.assertEqual(
+                    self.author_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag
+                    ).status_code,
+                    HTTPStatus.NOT_MODIFIED,
+                )
+                self.note.text = f'Новый текст для {url}'
+                self.note.save()
+                self.assertEqual(
+                    self.author_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag
+                    ).status_code,
+                    HTTPStatus.OK,
+                )
+
+    def test_other_user_gets_own_etag(self):
+        """ETag списка зависит от пользователя."""
+        self.assertNotEqual(
+            self.author_client.get(URL.list)['ETag'],
+            self.user_client.get(URL.list)['ETag'],
+        )
@@ -1,10 +1,23 @@
+import json
+import tempfile
 from http import HTTPStatus
+from io import StringIO
+from unittest import mock
 
-from django.test import Client, TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from pytils.translit import slugify
 
+from notes.cache import LOCK_KEY, get_note, note_cache_stats
 from notes.forms import WARNING
+from notes.importer import import_notes
 from notes.models import Note
+from notes.slugs import build_slug, slug_cache_stats
 from notes.tests.core import (
     CoreTestCase,
     FIELD_DATA,
@@ -15,9 +28,13 @@ from notes.tests.core import (
     SLUG,
     USER_MODEL,
 )
+from yacommon.cache import require_shared_cache
+from yacommon.metrics import registry
 
 
 class CheckData(TestCase):
+    databases = CoreTestCase.databases
+
     def check_data(self, field_data):
         """Сравнение данных заметки в БД с данными отправленными в форме."""
         note = Note.objects.get()
@@ -131,6 +148,96 @@ class TestCreateNote(CheckData):
             ),
         )
 
+    def test_empty_slug_collision(self):
+        """Совпавший автоматический slug получает числовой суффикс."""
+        self.form_data.pop('slug')
+        for _ in range(3):
+            self.author_client.post(URL.add, data=self.form_data)
+        expected_slug = slugify(self.form_data['title'])
+        self.assertEqual(
+            sorted(Note.objects.values_list('slug', flat=True)),
+            [expected_slug, f'{expected_slug}-2', f'{expected_slug}-3'],
+            msg='Повторяющиеся slug должны получать суффиксы -2, -3.',
+        )
+
+    def test_import_notes(self):
+        """
+        Импорт пакетом подбирает slug для повторяющихся заголовков,
+        а занятый явный slug отклоняет.
+        """
+        Note.objects.create(**dict(zip(FIELD_NAMES, self.field_data)))
+        records = [
+            {'title': FIELD_DATA[0], 'text': 'Импорт'},
+            {'title': FIELD_DATA[0], 'text': 'Импорт'},
+            {'title': 'Свой адрес', 'text': 'Импорт', 'slug': SLUG},
+            {'title': 'Без текста'},
+            {'title': 'Новый адрес', 'text': 'Импорт', 'slug': 'new-slug'},
+            {'title': 'Повтор адреса', 'text': 'Импорт', 'slug': 'new-slug'},
+        ]
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.ndjson', encoding='utf-8'
+        ) as file:
+            file.write('\n'.join(json.dumps(record) for record in records))
+            file.flush()
+            stderr = StringIO()
+            call_command(
+                'import_notes', AUTHOR, file.name, '--batch-size', '2',
+                stdout=StringIO(), stderr=stderr,
+            )
+        expected_slug = slugify(FIELD_DATA[0])
+        self.assertEqual(
+            sorted(Note.objects.filter(text='Импорт').values_list(
+                'slug', flat=True
+            )),
+            sorted([expected_slug, f'{expected_slug}-2', 'new-slug']),
+        )
+        self.assertEqual(
+            Note.objects.filter(tokens__token='импорт').count(), 3
+        )
+        errors = stderr.getvalue()
+        for number, slug in ((3, SLUG), (6, 'new-slug')):
+            with self.subTest(number=number):
+                self.assertIn(f'Запись {number}: {[slug + WARNING]}', errors)
+
+    def test_slug_collision_with_longer_slugs(self):
+        """Длинные slug с тем же началом не мешают подобрать суффикс."""
+        Note.objects.create(title=FIELD_DATA[0], author=self.author)
+        Note.objects.bulk_create(
+            Note(
+                title=f'{FIELD_DATA[0]} о длинной жизни номер {i}',
+                slug=slugify(f'{FIELD_DATA[0]} о длинной жизни номер {i}'),
+                author=self.author,
+            )
+            for i in range(120)
+        )
+        self.author_client.post(URL.add, data={
+            'title': FIELD_DATA[0], 'text': FIELD_DATA[1]
+        })
+        self.assertTrue(
+            Note.objects.filter(slug=f'{slugify(FIELD_DATA[0])}-2').exists()
+        )
+
+    def test_slug_cache(self):
+        """Повторная транслитерация заголовка берётся из кэша."""
+        build_slug.cache_clear()
+        expected_slug = slugify(FIELD_DATA[0])
+        for _ in range(2):
+            self.assertEqual(build_slug(FIELD_DATA[0], 100), expected_slug)
+        stats = slug_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_slug_collision_queries(self):
+        """Подбор slug при конфликте занимает ограниченное число запросов."""
+        for _ in range(5):
+            Note.objects.create(title=FIELD_DATA[0], author=self.author)
+        note = Note(title=FIELD_DATA[0], text=FIELD_DATA[1])
+        note.author = self.author
+        # Вставка, поиск занятых суффиксов, повторная вставка,
+        # запись в поисковый индекс и служебные запросы точек сохранения.
+        with self.assertNumQueries(9):
+            note.save()
+        self.assertEqual(note.slug, f'{slugify(FIELD_DATA[0])}-6')
+
 
 class TestNoteEditDelete(CoreTestCase, CheckData):
     @classmethod
@@ -187,3 +294,104 @@ class TestNoteEditDelete(CoreTestCase, CheckData):
             ),
         )
         super().check_data((*FIELD_DATA, self.author))
+
+    @override_settings(NOTE_CACHE=True)
+    def test_note_cache(self):
+        """Повторный просмотр идёт из кэша, правка сбрасывает старый slug."""
+        self.author_client.get(URL.detail)
+        # Только сессия и пользователь.
+        with self.assertNumQueries(2):
+            self.author_client.get(URL.detail)
+        self.author_client.post(URL.edit, data=self.new_data)
+        self.assertEqual(
+            self.author_client.get(URL.detail).status_code,
+            HTTPStatus.NOT_FOUND,
+        )
+        response = self.author_client.get(
+            URL.detail.replace(SLUG, self.new_data['slug'])
+        )
+        self.assertEqual(response.context['note'].title, FIELD_NEW_DATA[0])
+        stats = note_cache_stats(reset=True)
+        self.assertEqual((stats['hits'], stats['misses']), (1, 3))
+        output = StringIO()
+        call_command('note_cache_stats', stdout=output)
+        self.assertIn('Попаданий: 0', output.getvalue())
+
+    @override_settings(NOTE_CACHE=True)
+    def test_note_cache_import(self):
+        """Импорт сбрасывает закэшированный ответ 404 для нового slug."""
+        url = URL.detail.replace(SLUG, 'imported')
+        self.assertEqual(
+            self.author_client.get(url).status_code, HTTPStatus.NOT_FOUND
+        )
+        import_notes(self.author, [
+            {'title': 'Импорт', 'text': 'Текст', 'slug': 'imported'}
+        ])
+        self.assertEqual(
+            self.author_client.get(url).status_code, HTTPStatus.OK
+        )
+
+    def test_note_cache_requires_shared_cache(self):
+        """Кэш заметок нельзя включить с кэшем одного процесса."""
+        with self.settings(NOTE_CACHE=True), self.assertRaises(
+            ImproperlyConfigured
+        ):
+            require_shared_cache('NOTE_CACHE')
+
+    @override_settings(NOTE_CACHE_LOCK=True, NOTE_CACHE_LOCK_TIMEOUT=0.05)
+    def test_note_cache_lock(self):
+        """Не дождавшись загрузки заметки другим запросом, идём в базу."""
+        cache.add(LOCK_KEY.format(author_id=self.author.pk, slug=SLUG), 1)
+        self.assertEqual(get_note(self.author.pk, SLUG), self.note)
+        stats = note_cache_stats()
+        self.assertEqual((stats['lock_waits'], stats['lock_timeouts']), (1, 1))
+
+
+class TestCachedUser(CoreTestCase):
+    @override_settings(AUTH_USER_CACHE=True)
+    def test_cached_user(self):
+        """Пользователь берётся из кэша, смена пароля завершает сессию."""
+        for backend, engine in settings.SESSION_BACKENDS.items():
+            with self.subTest(backend=backend), self.settings(
+                SESSION_ENGINE=engine
+            ):
+                client = Client()
+                client.force_login(self.author)
+                client.get(URL.list)
+                with CaptureQueriesContext(connection) as context:
+                    client.get(URL.list)
+                queries = ' '.join(query['sql'] for query in context)
+                self.assertNotIn('auth_user', queries)
+                self.assertIs(
+                    'django_session' in queries, backend == 'db'
+                )
+                self.author.set_password(backend)
+                self.author.save()
+                self.assertEqual(
+                    client.get(URL.list).status_code, HTTPStatus.FOUND
+                )
+
+
+class TestMetrics(CoreTestCase):
+    def test_dump_metrics(self):
+        """Проверка заголовка Server-Timing и сводки метрик по URL."""
+        response = self.author_client.get(URL.list)
+        self.assertIn('total;dur=', response['Server-Timing'])
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(METRICS_DIR=directory):
+                registry.flush()
+                output = StringIO()
+                call_command('dump_metrics', '--json', stdout=output)
+        self.assertGreaterEqual(
+            json.loads(output.getvalue())['notes:list']['requests'], 1
+        )
+
+    def test_streaming_metrics(self):
+        """Запросы при чтении потокового ответа попадают в метрики."""
+        with mock.patch.object(registry, 'record') as record:
+            with CaptureQueriesContext(connection) as context:
+                response = self.author_client.get(URL.export)
+                record.assert_not_called()
+                b''.join(response.streaming_content)
+        record.assert_called_once()
+        self.assertEqual(record.call_args.kwargs['queries'], len(context))
@@ -0,0 +1,35 @@
+from notes.models import Note
+from notes.tests.core import CoreTestCase, QueryCountMixin, URL, USER_MODEL
+
+DATA_SIZES = (1, 5, 20)
+QUERY_PARAMS = {'search': '?q=заголовок'}
+
+
+class TestQueryCount(CoreTestCase, QueryCountMixin):
+    def seed(self, size):
+        """Добавляет заметки автора и других пользователей."""
+        for _ in range(size):
+            number = USER_MODEL.objects.count()
+            Note.objects.create(
+                title=f'Заголовок {number}', text='Текст', author=self.author
+            )
+            Note.objects.create(
+                title=f'Заголовок {number}',
+                text='Текст',
+                author=USER_MODEL.objects.create(
+                    username=f'Читатель {number}'
+                ),
+            )
+
+    def test_queries_do_not_grow_with_data(self):
+        """Число запросов к БД не зависит от объёма данных."""
+        for name in URL._fields:
+            with self.subTest(name=name):
+                counts = self.count_queries(
+                    self.author_client,
+                    getattr(URL, name) + QUERY_PARAMS.get(name, ''),
+                    self.seed,
+                    DATA_SIZES,
+                    user=self.author,
+                )
+                self.assertQueriesFlat(name, counts)
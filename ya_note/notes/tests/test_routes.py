@@ -16,6 +16,8 @@ class TestRoutes(CoreTestCase):
             (URL.delete, self.author_client, HTTPStatus.OK, AUTHOR),
             (URL.add, self.user_client, HTTPStatus.OK, USER),
             (URL.list, self.user_client, HTTPStatus.OK, USER),
+            (URL.search, self.user_client, HTTPStatus.OK, USER),
+            (URL.export, self.user_client, HTTPStatus.OK, USER),
             (URL.success, self.user_client, HTTPStatus.OK, USER),
             (URL.detail, self.user_client, HTTPStatus.NOT_FOUND, USER),
             (URL.edit, self.user_client, HTTPStatus.NOT_FOUND, USER),
@@ -36,6 +38,8 @@ class TestRoutes(CoreTestCase):
         """Проверка редиректа для неавторизованного пользователя."""
         urls = (
             URL.list,
+            URL.search,
+            URL.export,
             URL.add,
             URL.success,
             URL.detail,
@@ -1,9 +1,17 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .cache import get_request_note
+from .export import EXPORTERS
 from .forms import NoteForm
+from .freshness import note_etag, note_updated_at, notes_list_etag
 from .models import Note
+from .search import search_notes
 
 
 class Home(generic.TemplateView):
@@ -25,6 +33,19 @@ class NoteBase(LoginRequiredMixin):
         """Пользователь может работать только со своими заметками."""
         return self.model.objects.filter(author=self.request.user)
 
+    def get_object(self, queryset=None):
+        """
+        Для чтения заметка берётся из кэша.
+
+        Изменение и удаление работают со свежей записью из базы.
+        """
+        if self.request.method not in ('GET', 'HEAD'):
+            return super().get_object(queryset)
+        note = get_request_note(self.request, self.kwargs['slug'])
+        if note is None:
+            raise Http404('Заметка не найдена.')
+        return note
+
 
 class NoteCreate(NoteBase, generic.CreateView):
     """Добавление заметки."""
@@ -49,11 +70,63 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
+@method_decorator(condition(etag_func=notes_list_etag), name='get')
 class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_COUNT_ON_PAGE
+
+    def get_queryset(self):
+        """Для списка не нужен текст заметок, загружаем только нужные поля."""
+        return super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
 
+
+class NoteSearch(NotesList):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '')
+        return search_notes(self.request.user, self.query).only(
+            'id', 'slug', 'title'
+        ).order_by('id')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
+class NoteExport(NoteBase, generic.View):
+    """Выгрузка всех заметок пользователя в NDJSON, CSV или zip."""
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'ndjson')
+        if export_format not in EXPORTERS:
+            return HttpResponseBadRequest(
+                f'Неизвестный формат: {export_format}.'
+            )
+        exporter, content_type = EXPORTERS[export_format]
+        notes = self.get_queryset().only(
+            'id', 'slug', 'title', 'text'
+        ).order_by('id').iterator(chunk_size=settings.NOTES_EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(
+            exporter(notes), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{export_format}"'
+        )
+        return response
+
+
+@method_decorator(
+    condition(etag_func=note_etag, last_modified_func=note_updated_at),
+    name='get',
+)
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
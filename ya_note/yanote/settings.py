@@ -1,8 +1,12 @@
+import os
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общие для YaNews и YaNote модули лежат в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
 
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
 
@@ -18,15 +22,17 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'yacommon.apps.YacommonConfig',
     'notes.apps.NotesConfig'
 ]
 
 MIDDLEWARE = [
+    'yacommon.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yacommon.auth.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -52,13 +58,78 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
+DATABASE_BACKENDS = {
+    'sqlite': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('SQLITE_NAME', BASE_DIR / 'db.sqlite3'),
+    },
+    # Для PostgreSQL нужен пакет psycopg2.
+    'postgres': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('POSTGRES_DB', 'yanote'),
+        'USER': os.getenv('POSTGRES_USER', 'yanote'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', 'localhost'),
+        'PORT': os.getenv('DB_PORT', '5432'),
+    },
+}
+# Пул соединений внутри процесса: соединение возвращается в пул
+# в конце запроса, а не закрывается.
+DATABASE_BACKENDS['postgres_pool'] = {
+    **DATABASE_BACKENDS['postgres'],
+    'ENGINE': 'yacommon.backends.postgresql_pool',
+    'POOL_MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+    'POOL_MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+    # Сколько секунд ждать свободное соединение, прежде чем открыть
+    # соединение в обход пула.
+    'POOL_TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 5)),
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        **DATABASE_BACKENDS[os.getenv('DB_BACKEND', 'sqlite')],
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        # Проверять постоянное соединение перед каждым запросом.
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS') == '1',
+    },
+}
+
+# Применяются к каждому новому соединению с SQLite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
 }
 
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanote',
+    },
+    'filebased': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', BASE_DIR / 'cache'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'locmem')],
+}
+
+# Хранилище сессий. signed_cookies обходится без запросов к базе,
+# но выход не отзывает уже выданную cookie: её копия остаётся рабочей.
+SESSION_BACKENDS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_BACKENDS[os.getenv('SESSION_BACKEND', 'db')]
+
+# Пользователь запроса берётся из кэша, а не из базы. Требует общего
+# кэша; срок жизни ограничивает устаревание после массовых update().
+AUTH_USER_CACHE = os.getenv('AUTH_USER_CACHE') == '1'
+AUTH_USER_CACHE_TIMEOUT = 60
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +158,24 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_PAGE = 50
+NOTES_EXPORT_CHUNK_SIZE = 500
+SLUG_CACHE_SIZE = 10_000
+
+# Кэш заметок по (автор, slug) для страниц заметки. Требует общего
+# для процессов кэша (CACHE_BACKEND=filebased).
+NOTE_CACHE = os.getenv('NOTE_CACHE') == '1'
+NOTE_CACHE_TIMEOUT = 60 * 5
+# Защита от одновременной загрузки одной заметки после промаха.
+NOTE_CACHE_LOCK = os.getenv('NOTE_CACHE_LOCK') == '1'
+NOTE_CACHE_LOCK_TIMEOUT = 1
+NOTE_CACHE_LOCK_POLL = 0.01
+
+# Каталог, куда процессы сбрасывают гистограммы метрик запросов.
+# Без него, в том числе в тестах, метрики не сохраняются.
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 60
+# Файлы процессов, не обновлявшиеся дольше суток, считаются
+# оставшимися от завершённых процессов и удаляются.
+METRICS_MAX_AGE = 24 * 60 * 60
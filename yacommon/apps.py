@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class YacommonConfig(AppConfig):
+    name = 'yacommon'
+    verbose_name = 'Общие модули YaNews и YaNote'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .cache import require_shared_cache
+
+        require_shared_cache('AUTH_USER_CACHE')
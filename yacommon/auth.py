@@ -0,0 +1,69 @@
+"""
+Пользователь запроса из кэша.
+
+AuthenticationMiddleware загружает пользователя из базы на каждом
+запросе. С AUTH_USER_CACHE пользователь берётся из кэша по id из сессии,
+а запись сбрасывается сигналами при сохранении и удалении пользователя.
+Массовые update() сигналов не посылают: после них нужно вызвать
+invalidate_user. Кэш должен быть общим для процессов, иначе сброс
+увидит только процесс, сохранивший пользователя.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+USER_KEY = 'auth:user:{user_id}'
+
+
+def user_key(user_id):
+    return USER_KEY.format(user_id=user_id)
+
+
+def invalidate_user(user_id):
+    cache.delete(user_key(user_id))
+
+
+def get_cached_user(request):
+    """
+    Пользователь из кэша, а при промахе — из бэкенда аутентификации.
+
+    Хэш пароля из сессии сверяется и для пользователя из кэша: смена
+    пароля по-прежнему завершает остальные сессии.
+    """
+    user_id = request.session.get(auth.SESSION_KEY)
+    backend = request.session.get(auth.BACKEND_SESSION_KEY)
+    if user_id is None or backend not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+    key = user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+    if not user.is_active:
+        # Как ModelBackend.get_user: неактивный пользователь не входит.
+        invalidate_user(user_id)
+        return AnonymousUser()
+    if not constant_time_compare(
+        request.session.get(auth.HASH_SESSION_KEY, ''),
+        user.get_session_auth_hash(),
+    ):
+        request.session.flush()
+        return AnonymousUser()
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware с пользователем из кэша при AUTH_USER_CACHE."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        if settings.AUTH_USER_CACHE:
+            request.user = SimpleLazyObject(
+                lambda: get_cached_user(request)
+            )
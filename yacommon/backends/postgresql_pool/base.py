@@ -0,0 +1,97 @@
+"""
+PostgreSQL с пулом соединений внутри процесса.
+
+Django 3.2 открывает новое соединение на каждый запрос или держит его
+в потоке до CONN_MAX_AGE. Здесь соединения берутся из общего пула
+процесса и возвращаются в него при закрытии, поэтому запросы не платят
+за установку соединения.
+
+Пул заводится на каждый набор параметров соединения, а не на алиас:
+тестовая база и реплика с другим хостом получают свои пулы. В пуле
+не больше POOL_MAX_SIZE соединений. Когда все они заняты, запрос ждёт
+освободившееся до POOL_TIMEOUT секунд, а затем открывает обычное
+соединение в обход пула: под пиковой нагрузкой процесс может держать
+больше POOL_MAX_SIZE соединений, зато запрос не падает с ошибкой.
+Такие соединения закрываются в конце запроса и пишутся в лог.
+"""
+import logging
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2.extras import register_default_jsonb
+from psycopg2.pool import ThreadedConnectionPool
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class Pool:
+    """Пул, который ждёт свободное соединение вместо PoolError."""
+
+    def __init__(self, min_size, max_size, conn_params):
+        self.connections = ThreadedConnectionPool(
+            min_size, max_size, **conn_params
+        )
+        self.slots = threading.BoundedSemaphore(max_size)
+
+    def get(self, timeout):
+        """Соединение из пула или None, если за timeout не освободилось."""
+        if not self.slots.acquire(timeout=timeout):
+            return None
+        try:
+            return self.connections.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+
+    def put(self, connection):
+        try:
+            self.connections.putconn(connection)
+        finally:
+            self.slots.release()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    pool = None
+
+    def get_pool(self, conn_params):
+        min_size = self.settings_dict.get('POOL_MIN_SIZE', 1)
+        max_size = self.settings_dict.get('POOL_MAX_SIZE', 10)
+        key = (min_size, max_size, repr(sorted(conn_params.items())))
+        with _pools_lock:
+            if key not in _pools:
+                _pools[key] = Pool(min_size, max_size, conn_params)
+            return _pools[key]
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        connection = pool.get(self.settings_dict.get('POOL_TIMEOUT', 5))
+        if connection is None:
+            logger.warning(
+                'Пул соединений %s исчерпан, открыто соединение в обход '
+                'пула.', self.alias,
+            )
+            self.pool = None
+            return super().get_new_connection(conn_params)
+        self.pool = pool
+        # Повторяет настройку из базового get_new_connection.
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def _close(self):
+        """Возвращает соединение в пул; незавершённая транзакция откатится."""
+        if self.connection is None:
+            return
+        if self.pool is None:
+            return super()._close()
+        pool, self.pool = self.pool, None
+        with self.wrap_database_errors:
+            pool.put(self.connection)
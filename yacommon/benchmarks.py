@@ -0,0 +1,192 @@
+"""
+Общие помощники для замеров производительности YaNews и YaNote.
+
+Модуль не импортирует Django при загрузке: проект подключает его
+в своём benchmarks/common.py до настройки Django.
+"""
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+
+def setup_django(settings_module, base_dir, db_name=None):
+    """
+    Настраивает Django проекта из base_dir на отдельную базу для замеров.
+
+    Рабочая база проекта не затрагивается: по умолчанию создаётся
+    временный файл SQLite, к которому применяются миграции.
+    """
+    sys.path.insert(0, str(base_dir))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    from django.conf import settings
+
+    settings.DEBUG = False
+    # Тестовый клиент ходит на testserver, метрики процесса не сохраняем.
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    settings.METRICS_DIR = None
+    settings.DATABASES['default']['NAME'] = str(
+        db_name or Path(tempfile.mkdtemp()) / 'bench.sqlite3'
+    )
+    django.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+
+
+def measure(func, repeat=20):
+    """Вызывает func несколько раз и возвращает время вызовов в мс."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summary(timings):
+    """Сводка по замерам в мс."""
+    return {
+        'p50': round(statistics.median(timings), 3),
+        'p95': round(percentile(timings, 95), 3),
+        'max': round(max(timings), 3),
+    }
+
+
+def summary_ms(timings):
+    """Сводка по задержкам запросов в мс с p99."""
+    return {
+        'p50': round(statistics.median(timings), 3),
+        'p95': round(percentile(timings, 95), 3),
+        'p99': round(percentile(timings, 99), 3),
+        'max': round(max(timings), 3),
+    }
+
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class LoadSession:
+    """
+    Клиент одного потока нагрузки.
+
+    Запросы идут через WSGI-обработчик тестового клиента в этом же
+    процессе; время, статус и число SQL-запросов из Server-Timing
+    копятся по меткам сценария.
+    """
+
+    def __init__(self, user=None):
+        from django.test import Client
+
+        self.client = Client()
+        self.user = user
+        self.results = defaultdict(list)
+        self.login()
+
+    def login(self):
+        if self.user is not None:
+            self.client.force_login(self.user)
+
+    def get(self, label, url):
+        return self.request(label, self.client.get, url)
+
+    def post(self, label, url, data=None):
+        return self.request(label, self.client.post, url, data or {})
+
+    def request(self, label, method, url, *args):
+        started = time.perf_counter()
+        response = method(url, *args)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        elapsed = (time.perf_counter() - started) * 1000
+        match = SERVER_TIMING_QUERIES.search(
+            response.get('Server-Timing', '')
+        )
+        self.results[label].append((
+            elapsed,
+            int(match[1]) if match else None,
+            response.status_code,
+        ))
+        return response
+
+
+def run_load(scenario, users, concurrency, iterations):
+    """
+    Выполняет сценарий в concurrency потоках по iterations раз в каждом.
+
+    scenario(session, number) делает запросы через LoadSession;
+    возвращается сводка по меткам: пропускная способность, задержки,
+    число SQL-запросов и ошибок.
+    """
+    from django.db import connection
+
+    sessions = [
+        LoadSession(users[index % len(users)] if users else None)
+        for index in range(concurrency)
+    ]
+    errors = []
+
+    def worker(index):
+        try:
+            for number in range(iterations):
+                scenario(sessions[index], index * iterations + number)
+        except Exception as error:
+            errors.append(repr(error))
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(index,))
+        for index in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    data = load_summary(sessions, time.perf_counter() - started)
+    if errors:
+        data['exceptions'] = errors
+    return data
+
+
+def load_summary(sessions, elapsed):
+    """Сводит результаты сессий по меткам сценария."""
+    merged = defaultdict(list)
+    for session in sessions:
+        for label, results in session.results.items():
+            merged[label].extend(results)
+    data = {}
+    for label, results in merged.items():
+        timings = [result[0] for result in results]
+        queries = [result[1] for result in results if result[1] is not None]
+        data[label] = {
+            'requests': len(results),
+            'rps': round(len(results) / elapsed, 1),
+            'latency_ms': summary_ms(timings),
+            'queries': {
+                'mean': round(statistics.mean(queries), 2),
+                'max': max(queries),
+            } if queries else None,
+            'errors': sum(result[2] >= 400 for result in results),
+        }
+    return data
+
+
+def report(data):
+    """Печатает результаты в JSON, пригодном для сравнения прогонов."""
+    print(json.dumps(data, ensure_ascii=False, indent=2))
@@ -0,0 +1,49 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+# Кэши, содержимое которых видно только своему процессу.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared_cache(alias='default'):
+    """Кэш виден всем процессам сайта."""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+
+def require_shared_cache(setting):
+    """
+    Не даёт включить кэширование с кэшем одного процесса.
+
+    Сброс записи после правки дошёл бы только до процесса, который
+    её выполнил, а остальные отдавали бы устаревшие данные.
+    """
+    if getattr(settings, setting) and not is_shared_cache():
+        raise ImproperlyConfigured(
+            f'{setting} требует общего для процессов кэша: '
+            f'задайте CACHE_BACKEND=filebased или другой общий бэкенд.'
+        )
+
+
+def make_etag(*parts):
+    """ETag из значений, от которых зависит ответ."""
+    return md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def incr_counter(key):
+    """
+    Увеличивает счётчик в кэше.
+
+    В файловом кэше incr не атомарен, поэтому под нагрузкой счётчики
+    показывают порядок величин, а не точные значения.
+    """
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
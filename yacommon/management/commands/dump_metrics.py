@@ -0,0 +1,54 @@
+import json
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from yacommon.metrics import expire_metrics, load_metrics
+
+PERCENTILES = (50, 95, 99)
+
+
+class Command(BaseCommand):
+    help = 'Выводит перцентили метрик по именам URL из всех процессов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json', action='store_true', help='Вывести результат в JSON.'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Удалить накопленные файлы метрик после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.METRICS_DIR:
+            raise CommandError('Метрики не сохраняются: задайте METRICS_DIR.')
+        expire_metrics(settings.METRICS_DIR, settings.METRICS_MAX_AGE)
+        views = load_metrics(settings.METRICS_DIR)
+        summary = {
+            view: {
+                'requests': histograms['total_ms'].total,
+                **{
+                    f'{name}_p{percent}': histogram.percentile(percent)
+                    for name, histogram in histograms.items()
+                    for percent in PERCENTILES
+                },
+            }
+            for view, histograms in sorted(views.items())
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+        else:
+            for view, values in summary.items():
+                self.stdout.write(
+                    f'{view}: запросов {values["requests"]}, '
+                    f'total p50/p95/p99 {values["total_ms_p50"]}/'
+                    f'{values["total_ms_p95"]}/{values["total_ms_p99"]} мс, '
+                    f'SQL p95 {values["queries_p95"]} шт. '
+                    f'за {values["db_ms_p95"]} мс, '
+                    f'шаблон p95 {values["template_ms_p95"]} мс'
+                )
+        if options['reset']:
+            shutil.rmtree(settings.METRICS_DIR, ignore_errors=True)
@@ -0,0 +1,271 @@
+import asyncio
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+
+# Счётчик запросов текущего HTTP-запроса. Переменная контекста видна
+# и в потоках sync_to_async, где асинхронные представления работают
+# с ORM.
+current_timer = ContextVar('current_timer', default=None)
+# Признак исчерпанного потока в MetricsMiddleware.stream.
+DONE = object()
+
+# Границы интервалов гистограмм: миллисекунды растут геометрически,
+# число запросов — почти линейно.
+MS_BOUNDS = tuple(round(0.1 * 1.5 ** power, 3) for power in range(30))
+COUNT_BOUNDS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100, 200, 500)
+METRICS = {
+    'total_ms': MS_BOUNDS,
+    'db_ms': MS_BOUNDS,
+    'template_ms': MS_BOUNDS,
+    'queries': COUNT_BOUNDS,
+}
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами, которую легко сложить."""
+
+    def __init__(self, bounds, counts=None):
+        self.bounds = bounds
+        self.counts = counts or [0] * (len(bounds) + 1)
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+
+    def merge(self, counts):
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+
+    @property
+    def total(self):
+        return sum(self.counts)
+
+    def percentile(self, percent):
+        """Верхняя граница интервала, в который попал перцентиль."""
+        rank = percent / 100 * self.total
+        seen = 0
+        for bound, count in zip((*self.bounds, float('inf')), self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return 0
+
+
+class Registry:
+    """
+    Гистограммы метрик по именам URL внутри одного процесса.
+
+    Каждый процесс периодически сбрасывает свои данные в отдельный
+    файл METRICS_DIR/<pid>.json, команда dump_metrics их складывает,
+    а файлы старше METRICS_MAX_AGE удаляет.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.flushed_at = time.monotonic()
+        atexit.register(self.flush)
+
+    def record(self, view, **values):
+        with self.lock:
+            histograms = self.views.setdefault(view, {
+                name: Histogram(bounds) for name, bounds in METRICS.items()
+            })
+            for name, value in values.items():
+                histograms[name].add(value)
+            flush = (
+                time.monotonic() - self.flushed_at
+                > settings.METRICS_FLUSH_INTERVAL
+            )
+        if flush:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            self.flushed_at = time.monotonic()
+            data = {
+                view: {
+                    name: histogram.counts
+                    for name, histogram in histograms.items()
+                }
+                for view, histograms in self.views.items()
+            }
+        if not data or not settings.METRICS_DIR:
+            return
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(data))
+        temporary.replace(path)
+
+
+registry = Registry()
+
+
+def expire_metrics(directory, max_age):
+    """Удаляет файлы процессов, которые не обновлялись max_age секунд."""
+    deadline = time.time() - max_age
+    for path in Path(directory).glob('*.json'):
+        try:
+            if path.stat().st_mtime < deadline:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def load_metrics(directory):
+    """Складывает гистограммы из файлов всех процессов."""
+    views = {}
+    for path in sorted(Path(directory).glob('*.json')):
+        for view, metrics in json.loads(path.read_text()).items():
+            histograms = views.setdefault(view, {
+                name: Histogram(bounds) for name, bounds in METRICS.items()
+            })
+            for name, counts in metrics.items():
+                histograms[name].merge(counts)
+    return views
+
+
+class QueryTimer:
+    """Считает запросы к базе и их время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def timed_execute(execute, sql, params, many, context):
+    """
+    Постоянная обёртка execute_wrapper каждого соединения.
+
+    Передаёт запрос счётчику текущего HTTP-запроса, если он есть;
+    ставится сигналом connection_created в любом потоке.
+    """
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+@contextmanager
+def timed_queries(timer):
+    """Запросы внутри блока, в том числе из sync_to_async, идут в timer."""
+    token = current_timer.set(timer)
+    try:
+        yield
+    finally:
+        current_timer.reset(token)
+
+
+def view_name(request):
+    return (
+        request.resolver_match.view_name
+        if request.resolver_match else 'unresolved'
+    )
+
+
+def measure(request, started, timer):
+    return {
+        'total_ms': (time.perf_counter() - started) * 1000,
+        'db_ms': timer.duration * 1000,
+        'template_ms': request.template_render_time * 1000,
+        'queries': timer.count,
+    }
+
+
+class MetricsMiddleware:
+    """
+    Замеряет число запросов к БД, время БД, рендеринга шаблона
+    и общее время ответа для каждого имени URL.
+
+    Значения отдаются в заголовке Server-Timing и копятся
+    в гистограммах процесса. Потоковый ответ замеряется до конца
+    его чтения: запросы, выполненные при отдаче частей, тоже
+    считаются, но в Server-Timing, отправленный раньше тела,
+    не попадают. Под ASGI middleware работает асинхронно и не
+    переводит цепочку в синхронный режим.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как MiddlewareMixin: Django вызовет __call__ как корутину.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        timer = QueryTimer()
+        request.template_render_time = 0.0
+        with timed_queries(timer):
+            response = self.get_response(request)
+        return self.finish(request, response, started, timer)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        timer = QueryTimer()
+        request.template_render_time = 0.0
+        with timed_queries(timer):
+            response = await self.get_response(request)
+        return self.finish(request, response, started, timer)
+
+    def finish(self, request, response, started, timer):
+        values = measure(request, started, timer)
+        response['Server-Timing'] = (
+            f'db;dur={values["db_ms"]:.2f};desc="{timer.count} queries", '
+            f'tpl;dur={values["template_ms"]:.2f}, '
+            f'total;dur={values["total_ms"]:.2f}'
+        )
+        if response.streaming:
+            response.streaming_content = self.stream(
+                response.streaming_content, request, started, timer
+            )
+        else:
+            registry.record(view_name(request), **values)
+        return response
+
+    def stream(self, content, request, started, timer):
+        """
+        Отдаёт части ответа и записывает метрики после последней.
+
+        Счётчик включается только на время чтения очередной части,
+        чтобы между частями он не оставался в контексте сервера.
+        """
+        content = iter(content)
+        try:
+            while True:
+                with timed_queries(timer):
+                    chunk = next(content, DONE)
+                if chunk is DONE:
+                    return
+                yield chunk
+        finally:
+            registry.record(
+                view_name(request), **measure(request, started, timer)
+            )
+
+    def process_template_response(self, request, response):
+        """Рендерим шаблон здесь, чтобы замерить время отрисовки."""
+        started = time.perf_counter()
+        response.render()
+        request.template_render_time += time.perf_counter() - started
+        return response
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth import invalidate_user
+from .metrics import timed_execute
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Сбрасывает пользователя в кэше после изменения.
+
+    Запись удаляется и после фиксации транзакции, чтобы параллельный
+    запрос не вернул в кэш старую версию.
+    """
+    invalidate_user(instance.pk)
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    """
+    Подключает к новому соединению счётчик запросов MetricsMiddleware.
+
+    Обёртка ставится первой: execute_wrapper снимает последнюю
+    из списка и не должен снять эту.
+    """
+    if timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, timed_execute)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Настраивает новое соединение с SQLite из SQLITE_PRAGMAS.
+
+    WAL не блокирует чтение на время записи, а busy_timeout заставляет
+    ждать освобождения блокировки вместо ошибки «database is locked».
+    Команды идут мимо курсоров Django и не попадают в счётчики запросов.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    """
+    Закрывает постоянные соединения, которые перестали отвечать.
+
+    В Django 3.2 нет встроенного CONN_HEALTH_CHECKS, поэтому проверка
+    перед запросом сделана здесь; новое соединение откроется по требованию.
+    """
+    for connection in connections.all():
+        if (
+            connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            and connection.connection is not None
+            and not connection.is_usable()
+        ):
+            connection.close()
@@ -0,0 +1,120 @@
+"""
+Фикстуры pytest, общие для тестов YaNews и YaNote.
+
+Подключаются в conftest.py проекта импортом:
+    from yacommon.testing import django_db_setup, fast_password_hasher
+"""
+import hashlib
+import os
+import shutil
+
+import django
+import pytest
+from django.conf import settings
+from django.db import connections
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    teardown_databases,
+)
+from filelock import FileLock
+
+SQLITE_ENGINE = 'django.db.backends.sqlite3'
+
+
+def migrations_hash():
+    """Отпечаток схемы: при изменении миграций шаблон базы пересоздаётся."""
+    digest = hashlib.md5(django.get_version().encode())
+    for path in sorted(settings.BASE_DIR.glob('*/migrations/*.py')):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def uses_sqlite_only():
+    return all(
+        connections[alias].settings_dict['ENGINE'] == SQLITE_ENGINE
+        for alias in connections
+    )
+
+
+def share_mirrors():
+    """
+    Зеркало (TEST.MIRROR) работает через соединение своей базы и видит
+    данные незавершённой транзакции теста.
+    """
+    for alias in connections:
+        mirror = connections[alias].settings_dict['TEST'].get('MIRROR')
+        if mirror:
+            connections[alias].settings_dict['NAME'] = (
+                connections[mirror].settings_dict['NAME']
+            )
+            connections[alias] = connections[mirror]
+
+
+@pytest.fixture(scope='session', autouse=True)
+def fast_password_hasher():
+    """Быстрый хэшер паролей на время тестов."""
+    with override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.MD5PasswordHasher'
+    ]):
+        yield
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(
+    request, django_test_environment, django_db_blocker, tmp_path_factory,
+    django_db_keepdb,
+):
+    """
+    Каждый процесс xdist работает со своими копиями шаблонной базы SQLite.
+
+    Шаблон мигрируется один раз и хранится в кэше pytest, пока
+    не изменятся миграции; процессы только копируют файл — по копии
+    на каждую базу из DATABASES. Без xdist или с другой СУБД базы
+    создаются как в pytest-django. В обоих случаях зеркала делят
+    соединение со своей базой.
+    """
+    worker_id = os.getenv('PYTEST_XDIST_WORKER')
+    if worker_id is None or not uses_sqlite_only():
+        with django_db_blocker.unblock():
+            config = setup_databases(
+                verbosity=request.config.option.verbose,
+                interactive=False,
+                keepdb=django_db_keepdb,
+            )
+        share_mirrors()
+        yield
+        if not django_db_keepdb:
+            with django_db_blocker.unblock():
+                teardown_databases(
+                    config, verbosity=request.config.option.verbose
+                )
+        return
+    template = request.config.cache.mkdir('django-db') / (
+        f'{migrations_hash()}.sqlite3'
+    )
+    with FileLock(f'{template}.lock'):
+        if not template.exists():
+            building = template.with_suffix('.tmp')
+            connection = connections['default']
+            connection.settings_dict['TEST']['NAME'] = str(building)
+            with django_db_blocker.unblock():
+                connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, serialize=False
+                )
+                connection.close()
+            building.replace(template)
+    for alias in connections:
+        connection = connections[alias]
+        connection.close()
+        if connection.settings_dict['TEST'].get('MIRROR'):
+            continue
+        database = tmp_path_factory.getbasetemp() / (
+            f'{worker_id}-{alias}.sqlite3'
+        )
+        shutil.copyfile(template, database)
+        connection.settings_dict['NAME'] = str(database)
+    share_mirrors()
+    yield
+    with django_db_blocker.unblock():
+        connections.close_all()